@@ -0,0 +1,69 @@
+"""
+assisted(speculative) decoding 벤치마크 (CPU)
+
+같은 프롬프트를 일반 greedy 생성과 draft 모델을 사용한 assisted decoding 으로 생성하고
+tokens/sec, 속도 향상, draft 토큰 수락률을 비교함.
+
+사용법 (FastAPI 디렉토리에서):
+    python -m benchmark.assisted_decoding_bench --model gpt2-medium --draft-model distilgpt2 --new-tokens 64
+"""
+import time
+import argparse
+
+import torch
+
+from llm.llama import LocalLLMProcessor
+
+PROMPTS = [
+    "다음은 YouTube 영상의 자막입니다. 핵심 내용을 3~5개의 주요 포인트로 요약해주세요.",
+    "The quick brown fox jumps over the lazy dog. Summarize the story in three sentences.",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="gpt2-medium")
+    parser.add_argument("--draft-model", default="distilgpt2")
+    parser.add_argument("--device-mode", choices=["cpu-fp32", "cpu-int8"], default="cpu-fp32")
+    parser.add_argument("--new-tokens", type=int, default=64)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    processor = LocalLLMProcessor(args.model, draft_model_path=args.draft_model, device_mode=args.device_mode)
+    processor.load_model()
+
+    def baseline(prompt: str) -> int:
+        inputs = processor.tokenizer(prompt, return_tensors="pt")
+        with torch.inference_mode():
+            outputs = processor.model.generate(
+                **inputs,
+                do_sample=False,
+                max_new_tokens=args.new_tokens,
+                pad_token_id=processor.tokenizer.pad_token_id
+            )
+        return outputs.shape[1] - inputs["input_ids"].shape[1]
+
+    def assisted(prompt: str) -> int:
+        before = processor.assisted_stats.new_tokens
+        processor.generate_assisted(prompt, args.new_tokens)
+        return processor.assisted_stats.new_tokens - before
+
+    results = {}
+    for label, fn in (("greedy", baseline), ("assisted", assisted)):
+        tokens = 0
+        started = time.perf_counter()
+        for _ in range(args.runs):
+            for prompt in PROMPTS:
+                tokens += fn(prompt)
+        elapsed = time.perf_counter() - started
+        results[label] = tokens / elapsed
+        print(f"{label:>8} : {tokens} tokens in {elapsed:.2f}s ({results[label]:.1f} tok/s)")
+
+    stats = processor.assisted_stats.to_dict()
+    print(f"acceptance rate : {stats['acceptance_rate']:.1%}, "
+          f"tokens per target forward : {stats['tokens_per_target_forward']:.2f}")
+    print(f"speedup : {results['assisted'] / results['greedy']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+/summarize 동시 요청 처리량 벤치마크 (동기 파이프라인 vs async 파이프라인)
+
+FastAPI 앱을 프로세스 안에서 실행하고, YouTube 자막 조회와 Ollama 는 가짜 구현으로 대체함.
+변경 전의 동기 파이프라인은 이벤트 루프를 막아 요청을 하나씩만 처리했으므로,
+기준선(sync)은 같은 파이프라인을 lock 으로 직렬화하여 재현함.
+
+사용법 (FastAPI 디렉토리에서):
+    python -m benchmark.concurrency_bench --requests 32 --concurrency 16 --llm-latency 0.5
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+# 저장소 루트의 공용 모듈 (common/) 을 import 할 수 있도록 경로를 추가함 (FastAPI/main.py 와 동일)
+REPO_ROOT = str(Path(__file__).resolve().parents[2])
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+os.environ.setdefault("SUMMARY_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "summary_cache.db"))
+
+import httpx
+from fastapi import HTTPException
+
+from benchmark.fake_ollama import FakeOllamaServer
+from benchmark.fake_youtube import FakeTranscriptProvider
+from main import app
+from request.request_model import YoutubeRequest
+from services import summarize_service
+
+
+serial_lock = asyncio.Lock()
+
+
+@app.post("/summarize/sync", include_in_schema=False)
+async def summarize_youtube_sync(request: YoutubeRequest):
+    # 변경 전 라우터처럼 한 번에 한 요청만 처리함
+    async with serial_lock:
+        result = await summarize_service.process_youtube_summary_async(request.url)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+
+async def run(path: str, total: int, concurrency: int, offset: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one(i: int) -> None:
+            video_id = f"bench{offset + i:06d}"
+            async with semaphore:
+                response = await client.post(path, json={"url" : f"https://youtu.be/{video_id}"})
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--transcript-latency", type=float, default=0.2)
+    parser.add_argument("--transcript-chars", type=int, default=2000)
+    args = parser.parse_args()
+
+    with FakeTranscriptProvider(args.transcript_latency, args.transcript_chars), \
+            FakeOllamaServer(latency=args.llm_latency) as fake_ollama:
+        summarize_service.OLLAMA_ENDPOINT = fake_ollama.endpoint
+
+        results = {}
+        for label, path, offset in (("sync", "/summarize/sync", 0), ("async", "/summarize", args.requests)):
+            elapsed = await run(path, args.requests, args.concurrency, offset)
+            results[label] = elapsed
+            print(f"{label:>5} : {args.requests} requests in {elapsed:.2f}s "
+                  f"({args.requests / elapsed:.2f} req/s, concurrency={args.concurrency})")
+
+        print(f"speedup : {results['sync'] / results['async']:.1f}x")
+
+    await summarize_service.close_async_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""
+벤치마크용 가짜 Ollama 서버 (/api/generate)
+
+실제 모델 대신 latency(첫 토큰까지의 지연)와 tokens_per_second 로 응답 시간을 흉내냄.
+"""
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOllamaServer:
+    def __init__(self,
+                 latency: float = 0.5,
+                 tokens_per_second: float = 0.0,
+                 response_tokens: int = 50,
+                 host: str = "127.0.0.1",
+                 port: int = 0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with fake._lock:
+                    fake.request_count += 1
+
+                time.sleep(fake.latency)
+                tokens = [f"토큰{i} " for i in range(fake.response_tokens)]
+
+                if payload.get("stream", True):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for token in tokens:
+                        time.sleep(fake._token_delay())
+                        self._write_chunk({"model" : payload.get("model"), "response" : token, "done" : False})
+                    self._write_chunk({"model" : payload.get("model"), "response" : "", "done" : True})
+                    self.wfile.write(b"0\r\n\r\n")
+                    return
+
+                time.sleep(fake._token_delay() * len(tokens))
+                body = json.dumps(
+                    {"model" : payload.get("model"), "response" : "".join(tokens), "done" : True},
+                    ensure_ascii=False
+                ).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_chunk(self, data: dict):
+                line = (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,40 @@
+"""
+벤치마크용 가짜 자막 제공자
+
+summarize_service.fetch_transcript_text 를 대체하여 YouTube 에 요청하지 않고
+지정한 지연 시간 후 지정한 길이의 자막을 반환함.
+"""
+import time
+
+from services import summarize_service
+
+
+class FakeTranscriptProvider:
+    def __init__(self, latency: float = 0.2, transcript_chars: int = 2000):
+        self.latency = latency
+        self.transcript_chars = transcript_chars
+        self.request_count = 0
+        sentence = "이것은 벤치마크용 가짜 자막 문장입니다. "
+        self.text = (sentence * (transcript_chars // len(sentence) + 1))[:transcript_chars]
+        self._original = None
+
+    def fetch_transcript_text(self, video_id, languages):
+        self.request_count += 1
+        time.sleep(self.latency)
+        return self.text
+
+    def install(self) -> "FakeTranscriptProvider":
+        self._original = summarize_service.fetch_transcript_text
+        summarize_service.fetch_transcript_text = self.fetch_transcript_text
+        return self
+
+    def uninstall(self) -> None:
+        if self._original is not None:
+            summarize_service.fetch_transcript_text = self._original
+            self._original = None
+
+    def __enter__(self) -> "FakeTranscriptProvider":
+        return self.install()
+
+    def __exit__(self, *exc) -> None:
+        self.uninstall()
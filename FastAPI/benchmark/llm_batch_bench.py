@@ -0,0 +1,64 @@
+"""
+LocalLLMProcessor 배치 생성 벤치마크 (CPU)
+
+같은 수의 동시 요청을 직렬 생성과 BatchGenerationEngine 으로 처리했을 때의 처리량을 비교함.
+
+사용법 (FastAPI 디렉토리에서):
+    python -m benchmark.llm_batch_bench --model sshleifer/tiny-gpt2 --requests 32 --batch-size 8
+"""
+import time
+import argparse
+import threading
+
+from llm.llama import LocalLLMProcessor
+
+
+def run(processor: LocalLLMProcessor, requests: int, concurrency: int, max_new_tokens: int,
+        serial: bool = False) -> float:
+    prompts = [f"요청 {i} : 다음 문장을 이어서 작성해주세요." for i in range(requests)]
+    semaphore = threading.Semaphore(concurrency)
+    # 직렬 생성은 한 번에 하나의 generate 만 실행되도록 lock 으로 감쌈
+    serial_lock = threading.Lock() if serial else None
+
+    def one(prompt: str) -> None:
+        with semaphore:
+            if serial_lock is not None:
+                with serial_lock:
+                    processor.generate_response(prompt, max_new_tokens)
+            else:
+                processor.generate_response(prompt, max_new_tokens)
+
+    threads = [threading.Thread(target=one, args=(prompt,)) for prompt in prompts]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="sshleifer/tiny-gpt2")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--wait-ms", type=float, default=20)
+    parser.add_argument("--device-mode", choices=["cpu-fp32", "cpu-int8"], default="cpu-fp32")
+    args = parser.parse_args()
+
+    serial = LocalLLMProcessor(args.model, device_mode=args.device_mode)
+    batched = LocalLLMProcessor(args.model, device_mode=args.device_mode,
+                                max_batch_size=args.batch_size, max_batch_wait_ms=args.wait_ms)
+    serial.load_model()
+
+    for label, processor in (("serial", serial), ("batched", batched)):
+        elapsed = run(processor, args.requests, args.concurrency, args.max_new_tokens, serial=processor is serial)
+        print(f"{label:>7} : {args.requests} requests in {elapsed:.2f}s ({args.requests / elapsed:.2f} req/s)")
+
+    batched.batch_engine.close()
+
+
+if __name__ == "__main__":
+    main()
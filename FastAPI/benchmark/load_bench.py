@@ -0,0 +1,124 @@
+"""
+/summarize 부하 벤치마크
+
+FastAPI 앱을 프로세스 안에서 실행하고 YouTube 자막과 Ollama 를 가짜 구현으로 대체한 뒤,
+여러 동시 요청 수준에서 처리량과 p50/p95/p99 지연 시간을 측정함.
+배포 전 summarize_service 변경으로 인한 성능 저하를 확인하는 용도.
+
+사용법 (FastAPI 디렉토리에서):
+    python -m benchmark.load_bench --concurrency 1 4 16 64 --requests-per-level 64 \
+        --llm-latency 0.3 --tokens-per-second 200 --response-tokens 100 --transcript-chars 20000
+"""
+import os
+import sys
+import math
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+# 저장소 루트의 공용 모듈 (common/) 을 import 할 수 있도록 경로를 추가함 (FastAPI/main.py 와 동일)
+REPO_ROOT = str(Path(__file__).resolve().parents[2])
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+os.environ.setdefault("SUMMARY_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "summary_cache.db"))
+
+import httpx
+
+from benchmark.fake_ollama import FakeOllamaServer
+from benchmark.fake_youtube import FakeTranscriptProvider
+from main import app
+from services import summarize_service
+from services.summary_cache import summary_cache
+from services.transcript_cache import transcript_cache
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """
+    nearest-rank 방식 백분위수
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_level(client: httpx.AsyncClient, path: str, concurrency: int,
+                    total: int, offset: int) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        video_id = f"load{offset + i:07d}"
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(path, json={"url" : f"https://youtu.be/{video_id}"})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency" : concurrency,
+        "requests" : total,
+        "errors" : errors,
+        "throughput" : total / elapsed,
+        "p50" : percentile(latencies, 50),
+        "p95" : percentile(latencies, 95),
+        "p99" : percentile(latencies, 99),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default="/summarize")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests-per-level", type=int, default=64)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="첫 토큰까지의 지연 (초)")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--response-tokens", type=int, default=100)
+    parser.add_argument("--transcript-latency", type=float, default=0.2)
+    parser.add_argument("--transcript-chars", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(
+        f"fake ollama : latency={args.llm_latency}s, {args.tokens_per_second} tok/s, "
+        f"{args.response_tokens} tokens / fake youtube : latency={args.transcript_latency}s, "
+        f"{args.transcript_chars} chars"
+    )
+    print(f"{'conc':>5} {'reqs':>5} {'err':>4} {'req/s':>8} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9}")
+
+    with FakeTranscriptProvider(args.transcript_latency, args.transcript_chars), \
+            FakeOllamaServer(latency=args.llm_latency,
+                             tokens_per_second=args.tokens_per_second,
+                             response_tokens=args.response_tokens) as fake_ollama:
+        summarize_service.OLLAMA_ENDPOINT = fake_ollama.endpoint
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            offset = 0
+            for concurrency in args.concurrency:
+                summary_cache.clear()
+                transcript_cache.clear()
+                stats = await run_level(client, args.path, concurrency, args.requests_per_level, offset)
+                offset += args.requests_per_level
+                print(
+                    f"{stats['concurrency']:>5} {stats['requests']:>5} {stats['errors']:>4} "
+                    f"{stats['throughput']:>8.2f} {stats['p50'] * 1000:>9.1f} "
+                    f"{stats['p95'] * 1000:>9.1f} {stats['p99'] * 1000:>9.1f}"
+                )
+
+    await summarize_service.close_async_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
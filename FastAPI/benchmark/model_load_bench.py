@@ -0,0 +1,96 @@
+"""
+모델 cold start 와 worker 별 메모리 벤치마크 (Linux, CPU)
+
+- per-worker : worker 마다 직접 모델을 로드 (기존 방식)
+- preload-fork : 부모 프로세스에서 model_registry.preload() 후 worker 를 fork (gunicorn --preload 방식)
+
+worker 별 Private(고유) 메모리와 PSS, 요청을 받을 수 있을 때까지 걸린 시간을 출력함.
+
+사용법 (FastAPI 디렉토리에서):
+    python -m benchmark.model_load_bench --model sshleifer/tiny-gpt2 --workers 4
+"""
+import os
+import time
+import argparse
+import multiprocessing as mp
+
+
+def memory_kb() -> dict:
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return {
+        "private" : values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+        "pss" : values.get("Pss", 0)
+    }
+
+
+def worker(model_path: str, started: float, results, barrier) -> None:
+    from llm.model_registry import model_registry
+
+    handle = model_registry.get(model_path, "cpu-fp32", background=False)
+    ready_seconds = time.perf_counter() - started
+
+    import torch
+    inputs = handle.tokenizer("안녕하세요", return_tensors="pt")
+    with torch.inference_mode():
+        handle.model.generate(**inputs, max_new_tokens=8, pad_token_id=handle.tokenizer.pad_token_id)
+
+    # 모든 worker 가 살아있는 상태에서 측정해야 공유 페이지가 PSS 에 나뉘어 반영됨
+    barrier.wait()
+    results.put({"pid" : os.getpid(), "ready_seconds" : ready_seconds, **memory_kb()})
+    barrier.wait()
+
+
+def run(mode: str, model_path: str, workers: int) -> None:
+    if mode == "preload-fork":
+        started = time.perf_counter()
+        from llm.model_registry import model_registry
+        model_registry.preload(model_path, "cpu-fp32")
+        context = mp.get_context("fork")
+    else:
+        started = time.perf_counter()
+        context = mp.get_context("spawn")
+
+    results = context.Queue()
+    barrier = context.Barrier(workers)
+    processes = [
+        context.Process(target=worker, args=(model_path, started, results, barrier))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    rows = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    print(f"[{mode}]")
+    for row in rows:
+        print(f"  pid {row['pid']} : ready {row['ready_seconds']:.2f}s, "
+              f"private {row['private'] / 1024:.1f} MiB, pss {row['pss'] / 1024:.1f} MiB")
+    print(f"  total private {sum(row['private'] for row in rows) / 1024:.1f} MiB, "
+          f"total pss {sum(row['pss'] for row in rows) / 1024:.1f} MiB, "
+          f"slowest ready {max(row['ready_seconds'] for row in rows):.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="sshleifer/tiny-gpt2")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=["per-worker", "preload-fork", "both"], default="both")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    import llm.llama  # noqa: F401
+    print(f"import llm.llama : {time.perf_counter() - started:.3f}s")
+
+    modes = ["per-worker", "preload-fork"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        run(mode, args.model, args.workers)
+
+
+if __name__ == "__main__":
+    main()
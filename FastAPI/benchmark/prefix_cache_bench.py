@@ -0,0 +1,61 @@
+"""
+prefix KV 캐시 prefill 벤치마크 (CPU)
+
+긴 고정 prefix + 짧은 suffix 프롬프트에 대해 첫 토큰 생성(prefill) 시간을
+prefix 캐시 사용 여부에 따라 비교함.
+
+사용법 (FastAPI 디렉토리에서):
+    python -m benchmark.prefix_cache_bench --model sshleifer/tiny-gpt2 --prefix-repeat 40 --runs 10
+"""
+import time
+import argparse
+import statistics
+
+from llm.llama import LocalLLMProcessor
+
+INSTRUCTION = (
+    "다음은 YouTube 영상의 자막입니다. 핵심 내용을 3~5개의 주요 포인트로 요약해주세요. "
+    "응답은 무조건 한글로 응답하세요. "
+    "각 포인트는 명확하고 구체적으로 작성해주세요.\n\n"
+)
+
+
+def measure(processor: LocalLLMProcessor, prompts, runs: int) -> float:
+    timings = []
+    for i in range(runs):
+        started = time.perf_counter()
+        processor.generate_response(prompts[i % len(prompts)], 1)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="sshleifer/tiny-gpt2")
+    parser.add_argument("--prefix-repeat", type=int, default=40, help="요약 지시문을 반복해 prefix 길이를 늘림")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--device-mode", choices=["cpu-fp32", "cpu-int8"], default="cpu-fp32")
+    args = parser.parse_args()
+
+    processor = LocalLLMProcessor(args.model, device_mode=args.device_mode)
+    processor.load_model()
+
+    prefix = INSTRUCTION * args.prefix_repeat
+    prompts = [prefix + f"영상 {i} 의 자막 내용입니다.\n\n요약:" for i in range(4)]
+    prefix_tokens = len(processor.tokenizer(prefix)["input_ids"])
+
+    without_cache = measure(processor, prompts, args.runs)
+
+    started = time.perf_counter()
+    processor.register_prefix(prefix)
+    register_seconds = time.perf_counter() - started
+    with_cache = measure(processor, prompts, args.runs)
+
+    print(f"prefix : {prefix_tokens} tokens (register {register_seconds * 1000:.1f} ms, "
+          f"{processor.prefix_cache.total_bytes / 1024 / 1024:.1f} MiB)")
+    print(f"prefill without cache : {without_cache * 1000:.1f} ms")
+    print(f"prefill with cache    : {with_cache * 1000:.1f} ms ({without_cache / with_cache:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
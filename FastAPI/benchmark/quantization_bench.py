@@ -0,0 +1,105 @@
+"""
+CPU 추론 모드 벤치마크 (cpu-fp32 vs cpu-int8)
+
+모드별로 별도 프로세스에서 모델을 로드하고 생성 속도(tokens/sec)와 메모리(RSS)를 측정함.
+
+사용법 (FastAPI 디렉토리에서):
+    python -m benchmark.quantization_bench --model sshleifer/tiny-gpt2 --new-tokens 64 --threads 4
+"""
+import time
+import argparse
+import resource
+import multiprocessing as mp
+
+PROMPT = "다음은 YouTube 영상의 자막입니다. 핵심 내용을 3~5개의 주요 포인트로 요약해주세요."
+
+
+def rss_mib() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def weight_mib(model) -> float:
+    """
+    모델 가중치가 차지하는 크기 (dynamic int8 Linear 는 packed weight 기준)
+    """
+    import torch
+
+    total = sum(p.numel() * p.element_size() for p in model.parameters())
+    for module in model.modules():
+        packed = getattr(module, "_packed_params", None)
+        if packed is not None and hasattr(packed, "_weight_bias"):
+            weight, bias = packed._weight_bias()
+            total += weight.numel() * weight.element_size()
+            if isinstance(bias, torch.Tensor):
+                total += bias.numel() * bias.element_size()
+    return total / 1024 / 1024
+
+
+def worker(model_path: str, device_mode: str, threads: int, new_tokens: int, runs: int, results) -> None:
+    import torch
+    from llm.llama import LocalLLMProcessor
+
+    baseline = rss_mib()
+    processor = LocalLLMProcessor(model_path, device_mode=device_mode, num_threads=threads)
+    processor.load_model()
+    loaded = rss_mib()
+
+    inputs = processor.tokenizer(PROMPT, return_tensors="pt")
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        with torch.inference_mode():
+            processor.model.generate(
+                **inputs,
+                max_new_tokens=new_tokens,
+                min_new_tokens=new_tokens,
+                do_sample=False,
+                pad_token_id=processor.tokenizer.pad_token_id
+            )
+        timings.append(time.perf_counter() - started)
+
+    results.put({
+        "device_mode" : device_mode,
+        "tokens_per_second" : new_tokens / min(timings),
+        "weights" : weight_mib(processor.model),
+        "model_rss" : loaded - baseline,
+        "rss" : rss_mib(),
+        "max_rss" : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "threads" : torch.get_num_threads()
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="sshleifer/tiny-gpt2")
+    parser.add_argument("--new-tokens", type=int, default=64)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    context = mp.get_context("spawn")
+    results = context.Queue()
+    rows = []
+    for device_mode in ("cpu-fp32", "cpu-int8"):
+        process = context.Process(
+            target=worker,
+            args=(args.model, device_mode, args.threads, args.new_tokens, args.runs, results)
+        )
+        process.start()
+        rows.append(results.get())
+        process.join()
+
+    for row in rows:
+        print(f"{row['device_mode']} : {row['tokens_per_second']:.1f} tok/s, "
+              f"weights {row['weights']:.0f} MiB, rss after load +{row['model_rss']:.0f} MiB, rss {row['rss']:.0f} MiB, "
+              f"peak {row['max_rss']:.0f} MiB (threads={row['threads']})")
+    print(f"speedup : {rows[1]['tokens_per_second'] / rows[0]['tokens_per_second']:.2f}x, "
+          f"weights : {rows[1]['weights'] / rows[0]['weights']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
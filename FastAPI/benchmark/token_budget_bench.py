@@ -0,0 +1,84 @@
+"""
+토큰 수 계산 / 프롬프트 packing 벤치마크
+
+- 긴 프롬프트의 토큰 수 계산 : 기존 문자 단위 반복 vs approx_token_count (vs 토크나이저, --tokenizer 지정 시)
+- 대화 기록 packing : 첫 호출(cold) 과 같은 기록에 메시지 하나가 추가된 다음 턴(warm, 캐시 사용)
+
+사용법 (FastAPI 디렉토리에서):
+    python -m benchmark.token_budget_bench --tokenizer /path/to/tokenizer
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# 저장소 루트의 공용 모듈 (common/) 을 import 할 수 있도록 경로를 추가함 (FastAPI/main.py 와 동일)
+REPO_ROOT = str(Path(__file__).resolve().parents[2])
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+from services.summarize_service import estimate_tokens
+from common.token_budget import TokenCounter, approx_token_count, pack_messages
+
+SAMPLE = "오늘 영상에서는 FastAPI 서버의 async 파이프라인을 설명합니다. The event loop should never block. "
+
+
+def char_loop_count(text: str) -> int:
+    """
+    기존 estimate_tokens 구현 (문자 단위 반복)
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii) // 4 + 1
+
+
+def timed(fn, *args, repeat: int = 5) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokenizer", default=None)
+    parser.add_argument("--num-ctx", type=int, default=8192)
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    counter = TokenCounter(args.tokenizer) if args.tokenizer else None
+
+    print("[count]")
+    for chars in (10_000, 100_000, 1_000_000):
+        text = (SAMPLE * (chars // len(SAMPLE) + 1))[:chars]
+        assert char_loop_count(text) == approx_token_count(text) == estimate_tokens(text)
+        line = (f"  {chars:>9} chars : char loop {timed(char_loop_count, text):8.2f} ms, "
+                f"approx {timed(approx_token_count, text):6.2f} ms")
+        if counter is not None and counter.exact:
+            exact = counter.tokenizer(text, add_special_tokens=False)["input_ids"]
+            line += (f", tokenizer {timed(lambda t: counter.tokenizer(t, add_special_tokens=False), text, repeat=1):8.2f} ms "
+                     f"(exact {len(exact)} / approx {approx_token_count(text)} tokens)")
+        print(line)
+
+    print("[pack]")
+    packer_counter = counter or TokenCounter()
+    messages = [{"role" : "system", "content" : SAMPLE * 20}]
+    for turn in range(args.turns):
+        messages.append({"role" : "user", "content" : f"{turn}번째 질문 : " + SAMPLE * 3})
+        messages.append({"role" : "assistant", "content" : SAMPLE * 10})
+
+    started = time.perf_counter()
+    packed = pack_messages(messages, args.num_ctx, 1024, packer_counter)
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    messages.append({"role" : "user", "content" : "새 질문 : " + SAMPLE})
+    started = time.perf_counter()
+    packed = pack_messages(messages, args.num_ctx, 1024, packer_counter)
+    warm_ms = (time.perf_counter() - started) * 1000
+
+    print(f"  {len(messages)} messages -> {len(packed.messages)} messages, "
+          f"cold {cold_ms:.2f} ms, next turn {warm_ms:.2f} ms")
+    print(f"  report : {packed.report}")
+
+
+if __name__ == "__main__":
+    main()
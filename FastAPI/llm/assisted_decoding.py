@@ -0,0 +1,60 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict
+
+class AssistedDecodingStats:
+    """
+    assisted(speculative) decoding 통계
+
+    draft 모델의 forward 한 번이 후보 토큰 하나를 제안하고, 본 모델의 forward 한 번이 후보를 검증한 뒤
+    토큰 하나를 추가로 확정함. 따라서 확정된 후보 수 = 생성 토큰 수 - 본 모델 forward 수.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.new_tokens = 0
+        self.target_forwards = 0
+        self.draft_forwards = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, target_model, draft_model):
+        """
+        with 블록 안에서 실행된 두 모델의 forward 횟수를 집계함
+        """
+        counts = {"target" : 0, "draft" : 0}
+
+        def counter(name):
+            def hook(module, args, output):
+                counts[name] += 1
+            return hook
+
+        handles = [
+            target_model.register_forward_hook(counter("target")),
+            draft_model.register_forward_hook(counter("draft")),
+        ]
+        result = {"new_tokens" : 0}
+        try:
+            yield result
+        finally:
+            for handle in handles:
+                handle.remove()
+            with self._lock:
+                self.calls += 1
+                self.new_tokens += result["new_tokens"]
+                self.target_forwards += counts["target"]
+                self.draft_forwards += counts["draft"]
+
+    @property
+    def accepted_tokens(self) -> int:
+        return max(self.new_tokens - self.target_forwards, 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls" : self.calls,
+            "new_tokens" : self.new_tokens,
+            "target_forwards" : self.target_forwards,
+            "draft_forwards" : self.draft_forwards,
+            "acceptance_rate" : self.accepted_tokens / self.draft_forwards if self.draft_forwards else None,
+            "tokens_per_target_forward" : self.new_tokens / self.target_forwards if self.target_forwards else None
+        }
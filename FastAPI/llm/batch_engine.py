@@ -0,0 +1,97 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+class BatchGenerationEngine:
+    """
+    동시에 들어온 생성 요청을 짧은 시간(max_wait_ms) 동안 모아서 한 번의 generate 로 처리함
+
+    batch_fn(prompts, max_length) 은 프롬프트 순서대로 결과 리스트를 반환해야 함.
+    max_length 가 다른 요청은 같은 배치에 넣지 않고 다음 배치로 넘김.
+    """
+
+    def __init__(self,
+                 batch_fn: Callable[[List[str], int], List[str]],
+                 max_batch_size: int = 8,
+                 max_wait_ms: float = 20):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[str, int, Future]]" = queue.Queue()
+        self._carry: List[Tuple[str, int, Future]] = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="batch-generation", daemon=True)
+        self._thread.start()
+
+    def submit(self, prompt: str, max_length: int = 512) -> Future:
+        if self._closed:
+            raise RuntimeError("BatchGenerationEngine 이 종료되었습니다.")
+        future: Future = Future()
+        self._queue.put((prompt, max_length, future))
+        return future
+
+    def generate(self, prompt: str, max_length: int = 512) -> str:
+        return self.submit(prompt, max_length).result()
+
+    def _next_request(self, timeout=None):
+        if self._carry:
+            return self._carry.pop(0)
+        return self._queue.get(timeout=timeout)
+
+    def _collect(self) -> List[Tuple[str, int, Future]]:
+        first = self._next_request()
+        if first is None:
+            return []
+
+        batch = [first]
+        deferred = []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and not self._carry:
+                break
+            try:
+                request = self._next_request(timeout=max(remaining, 0))
+            except queue.Empty:
+                break
+            if request is None:
+                # 종료 신호는 현재 배치를 처리한 뒤 다시 받도록 되돌려 놓음
+                self._queue.put(None)
+                break
+            if request[1] == first[1]:
+                batch.append(request)
+            else:
+                deferred.append(request)
+
+        self._carry = deferred + self._carry
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if not batch:
+                break
+
+            batch = [request for request in batch if request[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            prompts = [prompt for prompt, _, _ in batch]
+            try:
+                results = self.batch_fn(prompts, batch[0][1])
+                for (_, _, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"배치 생성 오류 : {e}")
+                for _, _, future in batch:
+                    future.set_exception(e)
+
+    def close(self) -> None:
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
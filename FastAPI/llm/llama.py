@@ -1,36 +1,226 @@
-import logger
+import asyncio
+import logging
+import threading
+from typing import AsyncIterator, Dict, List, Optional, Union
 
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLm, pipeline
+from llm.assisted_decoding import AssistedDecodingStats
+from llm.batch_engine import BatchGenerationEngine
+from llm.model_registry import model_registry, load_causal_lm, DEFAULT_DEVICE_MODE
+from llm.prefix_cache import PrefixKVCache, DEFAULT_PREFIX_CACHE_BYTES
+from llm.streaming import stream_generation
 
-logging = logger.getLogger("logger")
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = "Bllossom/llama-3.2-Korean-Bllossom-3B"
+MODEL_LOAD_TIMEOUT = 600
 
 class LocalLLMProcessor:
     def __init__(self,
-                 model_path="Bllossom/llama-3.2-Korean-Bllossom-3B"):
+                 model_path=DEFAULT_MODEL_PATH,
+                 draft_model_path=None,
+                 device_mode=DEFAULT_DEVICE_MODE,
+                 num_threads=None,
+                 max_batch_size=1,
+                 max_batch_wait_ms=20,
+                 prefix_cache_bytes=DEFAULT_PREFIX_CACHE_BYTES):
+        """
+        모델은 model_registry 를 통해 백그라운드에서 로드되며, 같은 모델은 프로세스 안에서 공유됨
+        device_mode 로 로딩 방식을 선택함 (gpu-8bit / cpu-fp32 / cpu-int8, CPU 모드는 num_threads 지정 가능)
+        max_batch_size 가 1 보다 크면 동시에 들어온 요청을 모아서 한 번에 생성함 (BatchGenerationEngine)
+        register_prefix 로 등록한 prefix 로 시작하는 프롬프트는 prefix 의 key/value 상태를 재사용함
+        draft_model_path 를 지정하면 작은 draft 모델이 토큰을 제안하고 본 모델이 한 번에 검증하는
+        assisted decoding 을 사용함 (draft 모델은 같은 tokenizer 를 사용해야 함)
+        """
         self.model_path = model_path
-        self.tokenizer = None
-        self.model = None
+        self.device_mode = device_mode
+        self.num_threads = num_threads
+        self.handle = model_registry.get(model_path, device_mode, self._load_weights)
+        self.draft_model_path = draft_model_path
+        self.draft_handle = None
+        self.assisted_stats = AssistedDecodingStats()
+        # forward hook 으로 통계를 집계하므로 assisted decoding 은 한 번에 하나씩 실행함
+        self._assisted_lock = threading.Lock()
+        if draft_model_path:
+            self.draft_handle = model_registry.get(
+                draft_model_path,
+                device_mode,
+                lambda: load_causal_lm(draft_model_path, device_mode, num_threads)
+            )
+        self.batch_engine: Optional[BatchGenerationEngine] = None
+        self.prefix_cache = PrefixKVCache(prefix_cache_bytes)
+
+        if max_batch_size > 1:
+            self.batch_engine = BatchGenerationEngine(
+                self.generate_batch,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_batch_wait_ms
+            )
+
+    def _load_weights(self):
+        return load_causal_lm(self.model_path, self.device_mode, self.num_threads)
+
+    @property
+    def tokenizer(self):
+        return self.handle.tokenizer
+
+    @property
+    def model(self):
+        return self.handle.model
+
+    @property
+    def is_ready(self) -> bool:
+        return self.handle.is_ready
+
+    def load_model(self, timeout=MODEL_LOAD_TIMEOUT):
+        """
+        모델 로딩이 끝날 때까지 대기
+        """
+        for handle in (self.handle, self.draft_handle):
+            if handle is not None and not handle.wait(timeout):
+                raise RuntimeError(f"모델을 사용할 수 없습니다 : {handle.error or handle.status}")
+
+    def generate_batch(self, prompts: List[str], max_length=512) -> List[str]:
+        """
+        여러 프롬프트를 padding 하여 한 번의 generate 로 처리하고, 프롬프트별 생성 결과를 반환함
+        """
+        import torch
+
         self.load_model()
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True).to(self.model.device)
 
-    def load_model(self):
-        try:
-            logger.info(f"모델 로딩 중 : {self.model_path}")
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_path)
-            self.model = AutoModelForCausalLm.from_pretrained(
-                self.model_path,
-                torch_dtype=torch.float16,
-                device_map="auto",
-                load_in_8bit=True
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=max_length,
+                pad_token_id=self.tokenizer.pad_token_id
             )
 
-        except Exception as e:
-            logger.info(f"모델 로딩 오류 : {e}")
+        new_tokens = outputs[:, inputs["input_ids"].shape[1]:]
+        return self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+
+    def register_prefix(self, prefix: str) -> None:
+        """
+        자주 쓰는 프롬프트 prefix (요약 지시문, system prompt 등) 의 key/value 상태를 미리 계산해 둠
+        """
+        import torch
+
+        self.load_model()
+        input_ids = self.tokenizer(prefix, return_tensors="pt")["input_ids"].to(self.model.device)
+        with torch.inference_mode():
+            outputs = self.model(input_ids=input_ids, use_cache=True)
+        self.prefix_cache.put(prefix, input_ids, outputs.past_key_values)
+
+    def generate_with_prefix(self, prompt: str, max_length=512) -> Optional[str]:
+        """
+        등록된 prefix 로 시작하는 프롬프트면 prefix 이후 부분만 prefill 하여 생성함. 아니면 None.
+        """
+        import torch
+
+        self.load_model()
+        matched = self.prefix_cache.match(prompt)
+        if matched is None:
+            return None
+
+        prefix, prefix_ids, past_key_values = matched
+        # suffix 를 따로 tokenize 하면 prefix 경계에서 토큰이 달라질 수 있으므로 (끝의 공백 등)
+        # 전체 프롬프트를 tokenize 한 결과가 캐시된 prefix 토큰으로 시작할 때만 캐시를 사용함
+        input_ids = self.tokenizer(prompt, return_tensors="pt")["input_ids"].to(self.model.device)
+        prefix_length = prefix_ids.shape[1]
+        if input_ids.shape[1] <= prefix_length or not torch.equal(input_ids[:, :prefix_length], prefix_ids):
+            return None
+
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                input_ids=input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                past_key_values=past_key_values,
+                max_new_tokens=max_length,
+                pad_token_id=self.tokenizer.pad_token_id
+            )
+
+        return self.tokenizer.decode(outputs[0, input_ids.shape[1]:], skip_special_tokens=True)
+
+    def generate_assisted(self, prompt: str, max_length=512) -> str:
+        """
+        draft 모델을 사용한 assisted decoding (greedy)
+        """
+        import torch
+
+        self.load_model()
+        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
+
+        with self._assisted_lock, self.assisted_stats.track(self.model, self.draft_handle.model) as tracked, \
+                torch.inference_mode():
+            outputs = self.model.generate(
+                **inputs,
+                assistant_model=self.draft_handle.model,
+                do_sample=False,
+                max_new_tokens=max_length,
+                pad_token_id=self.tokenizer.pad_token_id
+            )
+            new_tokens = outputs[0, inputs["input_ids"].shape[1]:]
+            tracked["new_tokens"] = int(new_tokens.shape[0])
+
+        return self.tokenizer.decode(new_tokens, skip_special_tokens=True)
+
+    async def stream_response(self,
+                              prompt: str,
+                              max_length=512,
+                              cancel_event: Optional[threading.Event] = None) -> AsyncIterator[str]:
+        """
+        생성된 토큰을 디코딩되는 대로 반환하는 async iterator
+        생성은 worker 스레드에서 실행되며, cancel_event 가 설정되거나 iterator 가 닫히면 멈춤
+        """
+        await asyncio.to_thread(self.load_model)
+        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
+
+        def generate(**streaming_kwargs):
+            import torch
+
+            if self.draft_handle is None:
+                with torch.inference_mode():
+                    self.model.generate(
+                        **inputs,
+                        max_new_tokens=max_length,
+                        pad_token_id=self.tokenizer.pad_token_id,
+                        **streaming_kwargs
+                    )
+                return
 
+            # draft 모델이 있으면 generate_assisted 와 같은 방식으로 assisted decoding 을 사용함
+            with self._assisted_lock, self.assisted_stats.track(self.model, self.draft_handle.model) as tracked, \
+                    torch.inference_mode():
+                outputs = self.model.generate(
+                    **inputs,
+                    assistant_model=self.draft_handle.model,
+                    do_sample=False,
+                    max_new_tokens=max_length,
+                    pad_token_id=self.tokenizer.pad_token_id,
+                    **streaming_kwargs
+                )
+                tracked["new_tokens"] = int(outputs.shape[1] - inputs["input_ids"].shape[1])
 
-    def generate_response(self, prompt, max_length=512):
+        async for text in stream_generation(self.tokenizer, generate, cancel_event):
+            yield text
+
+    def generate_response(self, prompt, max_length=512) -> Union[str, Dict[str, str]]:
+        """
+        생성 결과를 반환함. 실패하면 (배치 전체가 실패한 경우 포함) {"error" : ...} 를 반환함
+        """
         try:
-            inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
-        
+            if self.draft_handle is not None:
+                return self.generate_assisted(prompt, max_length)
+
+            # 등록된 prefix 로 시작하는 프롬프트는 배치 대신 prefix 캐시를 사용함
+            if len(self.prefix_cache) > 0:
+                response = self.generate_with_prefix(prompt, max_length)
+                if response is not None:
+                    return response
+
+            if self.batch_engine is not None:
+                return self.batch_engine.generate(prompt, max_length)
+            return self.generate_batch([prompt], max_length)[0]
+
         except Exception as e:
-            logger.info(f"응답 생성 오류 : {e}")
\ No newline at end of file
+            logger.error(f"응답 생성 오류 : {e}")
+            return {"error" : f"응답 생성 중 오류 발생 : {str(e)}"}
@@ -0,0 +1,196 @@
+"""
+프로세스 단위 모델 레지스트리
+
+- 모델은 처음 요청될 때 백그라운드 스레드에서 로드하고, 짧은 생성으로 warm-up 한 뒤 ready 상태가 됨
+- 같은 (model_path, 옵션) 의 모델은 프로세스 안에서 한 번만 로드해 공유함
+- torch / transformers 는 실제로 로드할 때 import 하므로 모듈 import 비용이 없음
+- gunicorn --preload 처럼 fork 전에 preload() 를 호출하면 worker 들이 copy-on-write 로 가중치를 공유함
+"""
+import gc
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PROMPT = "안녕하세요"
+WARMUP_MAX_NEW_TOKENS = 4
+
+# 모델 로딩 방식
+#   gpu-8bit : GPU 에 8bit 로 로드 (bitsandbytes 필요)
+#   cpu-fp32 : CPU 에 fp32 로 로드
+#   cpu-int8 : CPU 에 fp32 로 로드한 뒤 Linear 레이어를 dynamic int8 양자화
+DEVICE_MODES = ("gpu-8bit", "cpu-fp32", "cpu-int8")
+DEFAULT_DEVICE_MODE = "gpu-8bit"
+
+# transformers 의 lazy import 는 스레드 안전하지 않으므로 여러 모델을 동시에 로드할 때 import 를 직렬화함
+_import_lock = threading.Lock()
+
+def load_causal_lm(model_path: str,
+                   device_mode: str = DEFAULT_DEVICE_MODE,
+                   num_threads: Optional[int] = None) -> Tuple[Any, Any]:
+    """
+    tokenizer 와 모델 로드
+    num_threads 는 CPU 모드에서 torch 연산 스레드 수 (프로세스 전체에 적용됨)
+    """
+    with _import_lock:
+        import torch
+        from transformers import AutoTokenizer, AutoModelForCausalLM
+
+    if device_mode not in DEVICE_MODES:
+        raise ValueError(f"지원하지 않는 device_mode 입니다 : {device_mode} (가능한 값 : {', '.join(DEVICE_MODES)})")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    # 배치 생성 시 프롬프트 끝이 맞도록 왼쪽 padding 사용
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    if device_mode == "gpu-8bit":
+        model = AutoModelForCausalLM.from_pretrained(
+            model_path,
+            torch_dtype=torch.float16,
+            device_map="auto",
+            load_in_8bit=True
+        )
+        model.eval()
+        return tokenizer, model
+
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+    model = AutoModelForCausalLM.from_pretrained(model_path, torch_dtype=torch.float32)
+    model.eval()
+
+    if device_mode == "cpu-int8":
+        # inplace 로 변환해야 fp32 Linear 가중치가 해제되어 메모리가 줄어듦
+        torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        gc.collect()
+
+    return tokenizer, model
+
+def warmup(tokenizer, model) -> None:
+    import torch
+
+    inputs = tokenizer(WARMUP_PROMPT, return_tensors="pt").to(model.device)
+    with torch.inference_mode():
+        model.generate(
+            **inputs,
+            max_new_tokens=WARMUP_MAX_NEW_TOKENS,
+            pad_token_id=tokenizer.pad_token_id
+        )
+
+class ModelHandle:
+    """
+    레지스트리에 등록된 모델 하나의 로딩 상태
+    status : loading -> ready / failed
+    """
+
+    def __init__(self, model_path: str, device_mode: str, loader: Callable[[], Tuple[Any, Any]]):
+        self.model_path = model_path
+        self.device_mode = device_mode
+        self.loader = loader
+        self.tokenizer = None
+        self.model = None
+        self.status = "loading"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self._ready = threading.Event()
+
+    def load(self) -> None:
+        try:
+            logger.info(f"모델 로딩 중 : {self.model_path} ({self.device_mode})")
+            started = time.perf_counter()
+            tokenizer, model = self.loader()
+            self.load_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            warmup(tokenizer, model)
+            self.warmup_seconds = time.perf_counter() - started
+
+            self.tokenizer, self.model = tokenizer, model
+            self.status = "ready"
+            logger.info(
+                f"모델 준비 완료 : {self.model_path} "
+                f"(로딩 {self.load_seconds:.1f}s, warm-up {self.warmup_seconds:.1f}s)"
+            )
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            logger.error(f"모델 로딩 오류 : {e}")
+        finally:
+            self._ready.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        로딩이 끝날 때까지 대기. ready 상태면 True.
+        """
+        self._ready.wait(timeout)
+        return self.status == "ready"
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status == "ready"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model_path" : self.model_path,
+            "device_mode" : self.device_mode,
+            "status" : self.status,
+            "error" : self.error,
+            "load_seconds" : self.load_seconds,
+            "warmup_seconds" : self.warmup_seconds
+        }
+
+class ModelRegistry:
+    def __init__(self):
+        self._handles: Dict[Tuple, ModelHandle] = {}
+        self._lock = threading.Lock()
+
+    def get(self,
+            model_path: str,
+            device_mode: str = DEFAULT_DEVICE_MODE,
+            loader: Optional[Callable[[], Tuple[Any, Any]]] = None,
+            background: bool = True) -> ModelHandle:
+        """
+        (model_path, device_mode) 의 모델 핸들 반환. 처음 요청된 모델이면 로딩을 시작함.
+        """
+        registry_key = (model_path, device_mode)
+        with self._lock:
+            handle = self._handles.get(registry_key)
+            if handle is not None:
+                return handle
+
+            handle = ModelHandle(
+                model_path,
+                device_mode,
+                loader or (lambda: load_causal_lm(model_path, device_mode))
+            )
+            self._handles[registry_key] = handle
+
+        if background:
+            threading.Thread(target=handle.load, name=f"model-load-{model_path}", daemon=True).start()
+        else:
+            handle.load()
+        return handle
+
+    def preload(self, model_path: str, device_mode: str = DEFAULT_DEVICE_MODE, loader=None) -> ModelHandle:
+        """
+        worker 를 fork 하기 전에 모델을 로드함.
+        로드 후 gc.freeze() 로 기존 객체를 GC 대상에서 빼서 fork 이후 메모리 페이지가 복사되지 않도록 함.
+        """
+        handle = self.get(model_path, device_mode, loader, background=False)
+        gc.freeze()
+        return handle
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            handles = list(self._handles.values())
+        return {
+            "ready" : bool(handles) and all(handle.is_ready for handle in handles),
+            "models" : [handle.to_dict() for handle in handles]
+        }
+
+model_registry = ModelRegistry()
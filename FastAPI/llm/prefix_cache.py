@@ -0,0 +1,80 @@
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFIX_CACHE_BYTES = 256 * 1024 * 1024
+
+def cache_nbytes(past_key_values) -> int:
+    """
+    past_key_values 가 차지하는 메모리 크기 (DynamicCache / legacy tuple 모두 지원)
+    """
+    if hasattr(past_key_values, "layers"):
+        return sum(
+            tensor.nbytes
+            for layer in past_key_values.layers
+            for tensor in (getattr(layer, "keys", None), getattr(layer, "values", None))
+            if tensor is not None
+        )
+    if hasattr(past_key_values, "key_cache"):
+        return sum(t.nbytes for t in past_key_values.key_cache) + sum(t.nbytes for t in past_key_values.value_cache)
+    return sum(tensor.nbytes for layer in past_key_values for tensor in layer)
+
+class PrefixKVCache:
+    """
+    등록된 프롬프트 prefix 의 attention key/value 상태를 저장하는 LRU 캐시
+
+    전체 크기가 max_bytes 를 넘으면 가장 오래 사용되지 않은 prefix 부터 삭제함.
+    generate 가 캐시를 수정하므로 조회 시에는 복사본을 반환함.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_PREFIX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[Any, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, prefix: str, input_ids, past_key_values) -> None:
+        nbytes = cache_nbytes(past_key_values)
+        if nbytes > self.max_bytes:
+            logger.warning(f"prefix 캐시 용량보다 큰 prefix 는 저장하지 않습니다 ({nbytes} bytes)")
+            return
+
+        with self._lock:
+            if prefix in self._entries:
+                self.total_bytes -= self._entries.pop(prefix)[2]
+            self._entries[prefix] = (input_ids, past_key_values, nbytes)
+            self.total_bytes += nbytes
+            while self.total_bytes > self.max_bytes:
+                _, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_bytes
+
+    def match(self, prompt: str) -> Optional[Tuple[str, Any, Any]]:
+        """
+        prompt 가 시작하는 가장 긴 prefix 를 찾아 (prefix, input_ids, past_key_values 복사본) 을 반환함
+        """
+        with self._lock:
+            best = None
+            for prefix in self._entries:
+                if prompt.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                    best = prefix
+            if best is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best)
+            self.hits += 1
+            input_ids, past_key_values, _ = self._entries[best]
+
+        return best, input_ids, copy.deepcopy(past_key_values)
+
+    def __contains__(self, prefix: str) -> bool:
+        return prefix in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+async def stream_generation(tokenizer,
+                            generate: Callable[..., Any],
+                            cancel_event: Optional[threading.Event] = None) -> AsyncIterator[str]:
+    """
+    generate(streamer=..., stopping_criteria=...) 를 worker 스레드에서 실행하고, 디코딩된 텍스트를 생성되는 대로 반환함
+
+    cancel_event 가 설정되거나 반환된 iterator 가 중간에 닫히면 (클라이언트 연결 종료 등)
+    다음 디코딩 스텝에서 생성을 멈춤
+    """
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList, TextStreamer
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    closed = threading.Event()
+
+    def should_stop() -> bool:
+        return closed.is_set() or (cancel_event is not None and cancel_event.is_set())
+
+    def put(item) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            # 이벤트 루프가 이미 종료된 경우
+            pass
+
+    class QueueStreamer(TextStreamer):
+        def on_finalized_text(self, text: str, stream_end: bool = False):
+            if text:
+                put(text)
+
+    class CancelCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return torch.full((input_ids.shape[0],), should_stop(), dtype=torch.bool, device=input_ids.device)
+
+    def worker() -> None:
+        try:
+            generate(
+                streamer=QueueStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True),
+                stopping_criteria=StoppingCriteriaList([CancelCriteria()])
+            )
+        except Exception as e:
+            put(e)
+        finally:
+            put(_DONE)
+
+    threading.Thread(target=worker, name="llm-stream", daemon=True).start()
+
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        closed.set()
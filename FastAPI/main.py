@@ -1,19 +1,62 @@
+import os
+import sys
 import logging
+from pathlib import Path
+from contextlib import asynccontextmanager
+
+# 저장소 루트의 공용 모듈 (common/) 을 import 할 수 있도록 앱 진입점에서 한 번만 경로를 추가함
+REPO_ROOT = str(Path(__file__).resolve().parents[1])
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
 
 import uvicorn
 from fastapi import FastAPI
 
+from llm.model_registry import model_registry, DEFAULT_DEVICE_MODE
+from llm.llama import DEFAULT_MODEL_PATH
 from router.chatbot_router import chatbot_router
 from router.finance_assistant import finance_router
+from router.metrics_router import metrics_router
 from router.summarize_router import summarize_router
+from services.summarize_service import close_async_client, transcript_executor
+from services.summary_job_service import summary_job_manager
 
 logger = logging.getLogger("main")
 
-app = FastAPI()
+# LLM_PRELOAD
+#   (미설정) : 첫 요청 시 모델 로드
+#   background : 서버 시작과 함께 백그라운드에서 로드 (/model/status 로 준비 상태 확인)
+#   blocking : import 시점에 로드. gunicorn --preload 와 함께 사용하면 worker 들이 가중치를 공유함
+#     gunicorn main:app -k uvicorn.workers.UvicornWorker -w 4 --preload
+LLM_PRELOAD = os.getenv("LLM_PRELOAD", "")
+LLM_MODEL_PATH = os.getenv("LLM_MODEL_PATH", DEFAULT_MODEL_PATH)
+# gpu-8bit / cpu-fp32 / cpu-int8
+LLM_DEVICE_MODE = os.getenv("LLM_DEVICE_MODE", DEFAULT_DEVICE_MODE)
+# assisted decoding 에 사용할 draft 모델 (미설정 시 사용하지 않음)
+LLM_DRAFT_MODEL_PATH = os.getenv("LLM_DRAFT_MODEL_PATH", "")
+
+if LLM_PRELOAD == "blocking":
+    model_registry.preload(LLM_MODEL_PATH, LLM_DEVICE_MODE)
+    if LLM_DRAFT_MODEL_PATH:
+        model_registry.preload(LLM_DRAFT_MODEL_PATH, LLM_DEVICE_MODE)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if LLM_PRELOAD == "background":
+        model_registry.get(LLM_MODEL_PATH, LLM_DEVICE_MODE)
+        if LLM_DRAFT_MODEL_PATH:
+            model_registry.get(LLM_DRAFT_MODEL_PATH, LLM_DEVICE_MODE)
+    yield
+    await summary_job_manager.shutdown()
+    await close_async_client()
+    transcript_executor.shutdown(wait=False)
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(chatbot_router)
 app.include_router(finance_router)
 app.include_router(summarize_router)
+app.include_router(metrics_router)
 
 if __name__ == "__main__":
     try:
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import List
+
+from pydantic import BaseModel, Field
 
 class TickerRequest(BaseModel):
     query : str
@@ -9,4 +11,9 @@ class ChatbotRequest(BaseModel):
     question : str
 
 class YoutubeRequest(BaseModel):
-    url : str
\ No newline at end of file
+    url : str
+
+class BatchYoutubeRequest(BaseModel):
+    urls : List[str] = Field(..., min_length=1, max_length=500)
+    transcript_concurrency : int = Field(8, ge=1, le=32)
+    llm_concurrency : int = Field(4, ge=1, le=16)
\ No newline at end of file
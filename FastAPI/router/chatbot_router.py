@@ -1,15 +1,40 @@
-from fastapi import APIRouter
+import json
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from services import chatbot_service
+from services.metrics_service import track_route
+from llm.model_registry import model_registry
 
-from request import ChatbotRequest
+from request.request_model import ChatbotRequest
 
 chatbot_router = APIRouter()
 
 @chatbot_router.post("/data/insert")
+@track_route("POST /data/insert")
 def insert_vectordb(file_path: str):
     return chatbot_service.process_insert_db(file_path)
 
 @chatbot_router.post("/chat")
-def get_response(request: ChatbotRequest):
-    print(request)
-    return None
\ No newline at end of file
+@track_route("POST /chat")
+async def get_response(request: ChatbotRequest):
+    async def event_stream():
+        async for event, data in chatbot_service.stream_chat_response(request.session_id, request.question):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control" : "no-cache", "X-Accel-Buffering" : "no"}
+    )
+
+@chatbot_router.delete("/chat/{session_id}")
+@track_route("DELETE /chat")
+def cancel_response(session_id: str):
+    if not chatbot_service.cancel_chat_stream(session_id):
+        raise HTTPException(status_code=404, detail="진행 중인 답변이 없습니다.")
+    return {"session_id" : session_id, "cancelled" : True}
+
+@chatbot_router.get("/model/status")
+def get_model_status():
+    return model_registry.status()
@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 from services import chatbot_service
 
-from request import ChatbotRequest
+from request.request_model import ChatbotRequest
 
 finance_router = APIRouter()
 
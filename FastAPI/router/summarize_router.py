@@ -1,17 +1,75 @@
+import json
+
 from fastapi import APIRouter, Query, HTTPException
-from services.summarize_service import process_youtube_summary, validate_youtube_url
-from request.request_model import YoutubeRequest
+from fastapi.responses import StreamingResponse
+from services.summarize_service import process_youtube_summary_async, stream_youtube_summary, validate_youtube_url
+from services.summary_job_service import summary_job_manager
+from services.summarize_batch_service import process_youtube_batch
+from services.metrics_service import track_route
+from request.request_model import BatchYoutubeRequest, YoutubeRequest
 
 summarize_router = APIRouter()
 
 @summarize_router.post("/summarize")
+@track_route("POST /summarize")
 async def summarize_youtube(request: YoutubeRequest):
     if not validate_youtube_url(request.url):
         raise HTTPException(status_code=400, detail="올바르지 않은 Youtube URL입니다.")
     
-    result = process_youtube_summary(request.url)
+    result = await process_youtube_summary_async(request.url)
 
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
 
-    return result
\ No newline at end of file
+    return result
+
+@summarize_router.get("/summarize/stream")
+@track_route("GET /summarize/stream")
+async def summarize_youtube_stream(url: str = Query(..., description="YouTube URL")):
+    if not validate_youtube_url(url):
+        raise HTTPException(status_code=400, detail="올바르지 않은 Youtube URL입니다.")
+
+    async def event_stream():
+        async for event, data in stream_youtube_summary(url):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control" : "no-cache", "X-Accel-Buffering" : "no"}
+    )
+
+@summarize_router.post("/summarize/batch")
+@track_route("POST /summarize/batch")
+async def summarize_youtube_batch(request: BatchYoutubeRequest):
+    async def result_stream():
+        async for result in process_youtube_batch(
+            request.urls,
+            transcript_concurrency=request.transcript_concurrency,
+            llm_concurrency=request.llm_concurrency
+        ):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+@summarize_router.post("/summarize/jobs", status_code=202)
+@track_route("POST /summarize/jobs")
+async def submit_summarize_job(request: YoutubeRequest):
+    if not validate_youtube_url(request.url):
+        raise HTTPException(status_code=400, detail="올바르지 않은 Youtube URL입니다.")
+
+    try:
+        job = summary_job_manager.submit(request.url)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return job.to_dict()
+
+@summarize_router.get("/summarize/jobs/{job_id}")
+@track_route("GET /summarize/jobs/{job_id}")
+async def get_summarize_job(job_id: str):
+    job = summary_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="요약 작업을 찾을 수 없습니다.")
+
+    return job.to_dict()
@@ -1,3 +1,21 @@
+import os
+import time
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from llm.llama import LocalLLMProcessor, DEFAULT_MODEL_PATH
+from llm.model_registry import DEFAULT_DEVICE_MODE
+
+logger = logging.getLogger(__name__)
+
+CHAT_MAX_NEW_TOKENS = 512
+
+_chat_processor: Optional[LocalLLMProcessor] = None
+_processor_lock = threading.Lock()
+# session_id 별로 진행 중인 스트리밍 생성의 취소 이벤트
+_active_streams: Dict[str, threading.Event] = {}
+
 def process_get_item(item_id: int, q: str = None):
     return {"item_id": item_id, "query": q}
 
@@ -26,4 +44,72 @@ def convert_csv():
     return None
 
 def convert_hwp():
-    return None
\ No newline at end of file
+    return None
+
+def get_chat_processor() -> LocalLLMProcessor:
+    """
+    /chat 에서 사용하는 LocalLLMProcessor (main.py 와 같은 LLM_* 환경 변수 사용)
+    """
+    global _chat_processor
+    with _processor_lock:
+        if _chat_processor is None:
+            _chat_processor = LocalLLMProcessor(
+                os.getenv("LLM_MODEL_PATH", DEFAULT_MODEL_PATH),
+                draft_model_path=os.getenv("LLM_DRAFT_MODEL_PATH") or None,
+                device_mode=os.getenv("LLM_DEVICE_MODE", DEFAULT_DEVICE_MODE)
+            )
+        return _chat_processor
+
+def cancel_chat_stream(session_id: str) -> bool:
+    """
+    session_id 의 진행 중인 생성을 취소함. 진행 중인 생성이 없으면 False.
+    """
+    cancel_event = _active_streams.get(session_id)
+    if cancel_event is None:
+        return False
+    cancel_event.set()
+    return True
+
+async def stream_chat_response(session_id: str, question: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    답변 토큰을 (event, data) 형태로 생성되는 대로 반환함 (SSE 라우터에서 사용)
+
+    event 종류 : token, done, error
+    같은 session_id 로 새 요청이 들어오면 이전 생성은 취소됨
+    """
+    started = time.perf_counter()
+    first_token_at = None
+    token_count = 0
+
+    def elapsed_ms(at: float) -> float:
+        return round((at - started) * 1000, 1)
+
+    previous = _active_streams.get(session_id)
+    if previous is not None:
+        previous.set()
+    cancel_event = threading.Event()
+    _active_streams[session_id] = cancel_event
+
+    try:
+        async for text in get_chat_processor().stream_response(question, CHAT_MAX_NEW_TOKENS, cancel_event):
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            token_count += 1
+            yield "token", {"text" : text}
+
+        yield "done", {
+            "session_id" : session_id,
+            "cancelled" : cancel_event.is_set(),
+            "chunks" : token_count,
+            "ttft_ms" : elapsed_ms(first_token_at) if first_token_at is not None else None,
+            "total_ms" : elapsed_ms(time.perf_counter())
+        }
+
+    except Exception as e:
+        logger.error(f"답변 생성 오류 : {e}")
+        yield "error", {"error" : f"답변 생성 중 오류가 발생했습니다 : {e}"}
+
+    finally:
+        cancel_event.set()
+        if _active_streams.get(session_id) is cancel_event:
+            del _active_streams[session_id]
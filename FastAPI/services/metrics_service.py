@@ -0,0 +1,211 @@
+"""
+Prometheus 텍스트 형식 메트릭
+
+운영 중에도 켜둘 수 있도록 의존성 없이 최소한으로 구현함.
+라벨 조합별 값은 처음 사용할 때 한 번만 만들어지고, 이후 기록은 lock 한 번과 덧셈/이분 탐색뿐임.
+"""
+import time
+import bisect
+import inspect
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_registry: List["Metric"] = []
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {child.value}"
+            for key, child in list(self._children.items())
+        ]
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+class _HistogramValue:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += counts[-1]
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+def render_metrics() -> str:
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+STAGE_LATENCY = Histogram(
+    "llm_stage_duration_seconds",
+    "Latency of each pipeline stage.",
+    ["stage"]
+)
+ROUTE_LATENCY = Histogram(
+    "llm_route_duration_seconds",
+    "Latency of router handlers (streaming routes measure time to response start).",
+    ["route"]
+)
+ROUTE_IN_FLIGHT = Gauge(
+    "llm_route_in_flight",
+    "Router handlers currently running.",
+    ["route"]
+)
+STAGE_IN_FLIGHT = Gauge(
+    "llm_stage_in_flight",
+    "Pipeline stages currently running.",
+    ["stage"]
+)
+CACHE_REQUESTS = Counter(
+    "llm_cache_requests_total",
+    "Cache lookups by cache and result.",
+    ["cache", "result"]
+)
+UPSTREAM_ERRORS = Counter(
+    "llm_upstream_errors_total",
+    "Errors returned by upstream services.",
+    ["upstream", "kind"]
+)
+
+@contextmanager
+def track_stage(stage: str):
+    """
+    with track_stage("get_transcript"): ... 형태로 단계별 소요 시간 기록
+    """
+    in_flight = STAGE_IN_FLIGHT.labels(stage)
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage).observe(time.perf_counter() - started)
+        in_flight.dec()
+
+def track_route(route: str):
+    """
+    라우터 핸들러 데코레이터 (동기/비동기 핸들러 모두 지원)
+    """
+    def decorator(func):
+        latency = ROUTE_LATENCY.labels(route)
+        in_flight = ROUTE_IN_FLIGHT.labels(route)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                in_flight.inc()
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    latency.observe(time.perf_counter() - started)
+                    in_flight.dec()
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            in_flight.inc()
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                latency.observe(time.perf_counter() - started)
+                in_flight.dec()
+        return wrapper
+
+    return decorator
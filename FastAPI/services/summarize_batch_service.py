@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List
+
+from services.summarize_service import extract_video_id, process_youtube_summary_async, validate_youtube_url
+
+logger = logging.getLogger(__name__)
+
+BATCH_TRANSCRIPT_CONCURRENCY = 8
+BATCH_LLM_CONCURRENCY = 4
+
+async def process_youtube_batch(urls: List[str],
+                                transcript_concurrency: int = BATCH_TRANSCRIPT_CONCURRENCY,
+                                llm_concurrency: int = BATCH_LLM_CONCURRENCY) -> AsyncIterator[Dict[str, Any]]:
+    """
+    여러 YouTube URL 을 동시에 요약하고, 끝나는 순서대로 결과를 반환함
+
+    - 올바르지 않은 URL 은 바로 에러 결과로 반환
+    - 같은 video_id 의 URL 은 한 번만 처리하고 결과에 모든 URL 을 포함
+    - 자막 조회와 LLM 호출의 동시 실행 수는 각각 transcript_concurrency, llm_concurrency 로 제한
+    - 한 항목이 실패해도 나머지 항목은 계속 처리함
+    """
+    urls_by_video: Dict[str, List[str]] = {}
+    for url in urls:
+        url = url.strip() if isinstance(url, str) else url
+        if not isinstance(url, str) or not validate_youtube_url(url):
+            yield {"urls" : [url], "status" : "error", "error" : "올바르지 않은 Youtube URL입니다."}
+            continue
+        urls_by_video.setdefault(extract_video_id(url), []).append(url)
+
+    if not urls_by_video:
+        return
+
+    logger.info(
+        f"일괄 요약 : {len(urls_by_video)}개 영상 "
+        f"(자막 동시 조회 {transcript_concurrency}개, LLM 동시 호출 {llm_concurrency}개)"
+    )
+    transcript_limiter = asyncio.Semaphore(transcript_concurrency)
+    llm_limiter = asyncio.Semaphore(llm_concurrency)
+
+    async def summarize(video_id: str, video_urls: List[str]) -> Dict[str, Any]:
+        try:
+            result = await process_youtube_summary_async(video_urls[0], transcript_limiter, llm_limiter)
+        except Exception as e:
+            result = {"error" : f"처리 중 오류 발생 : {str(e)}"}
+
+        if "error" in result:
+            return {"urls" : video_urls, "video_id" : video_id, "status" : "error", "error" : result["error"]}
+        return {"urls" : video_urls, **result}
+
+    tasks = [
+        asyncio.ensure_future(summarize(video_id, video_urls))
+        for video_id, video_urls in urls_by_video.items()
+    ]
+    try:
+        for future in asyncio.as_completed(tasks):
+            yield await future
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -1,19 +1,109 @@
+import os
 import re
-import requests
+import json
+import asyncio
+import hashlib
+import contextlib
+import httpx
 import logging
 import time
-from typing import Dict, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api.formatters import TextFormatter
 from youtube_transcript_api.errors import NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
 
+from common.token_budget import approx_token_count, get_token_counter
+
+from services.summary_cache import summary_cache, make_cache_key
+from services.transcript_cache import transcript_cache
+from services.metrics_service import track_stage, CACHE_REQUESTS, UPSTREAM_ERRORS
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 OLLAMA_ENDPOINT = "http://localhost:11434/api/generate"
 OLLAMA_MODEL = "llama3.2:3b"
+TRANSCRIPT_LANGUAGE_CODES = {
+    "ko" : ['ko', 'ko-KR'],
+    "en" : ['en', 'en-US', 'en-GB'],
+}
+DEFAULT_TRANSCRIPT_LANGUAGES = ("ko", "en")
+
+# Ollama 는 num_ctx 를 넘는 프롬프트를 경고 없이 잘라내므로 명시적으로 지정하고 프롬프트를 그 안에 맞춤
+OLLAMA_NUM_CTX = 8192
+# 토큰 수를 정확히 계산할 HuggingFace 토크나이저 (미설정 시 근사치)
+OLLAMA_TOKENIZER = os.getenv("OLLAMA_TOKENIZER") or None
+
+OLLAMA_OPTIONS = {
+    "temperature" : 0.7,
+    "top_p" : 0.9,
+    "max_tokens" : 1000,
+    "num_ctx" : OLLAMA_NUM_CTX
+}
+
+SUMMARY_PROMPT = (
+    "다음은 YouTube 영상의 자막입니다. 핵심 내용을 3~5개의 주요 포인트로 요약해주세요. "
+    "응답은 무조건 한글로 응답하세요. "
+    "각 포인트는 명확하고 구체적으로 작성해주세요.\n\n"
+    "자막 내용 : \n{text}\n\n"
+    "요약:"
+)
+CHUNK_SUMMARY_PROMPT = (
+    "다음은 YouTube 영상 자막의 일부({index}/{total})입니다. "
+    "이 구간의 핵심 내용을 빠짐없이 간결하게 정리해주세요. "
+    "응답은 무조건 한글로 응답하세요.\n\n"
+    "자막 내용 : \n{text}\n\n"
+    "정리:"
+)
+REDUCE_SUMMARY_PROMPT = (
+    "다음은 하나의 YouTube 영상 자막을 구간별로 정리한 내용입니다. "
+    "전체 영상의 핵심 내용을 3~5개의 주요 포인트로 요약해주세요. "
+    "응답은 무조건 한글로 응답하세요. "
+    "각 포인트는 명확하고 구체적으로 작성해주세요.\n\n"
+    "구간별 정리 : \n{text}\n\n"
+    "요약:"
+)
+# 구간별 정리가 한 프롬프트에 들어가지 않을 때 연속된 구간끼리 먼저 합치는 중간 단계 프롬프트
+MERGE_SUMMARY_PROMPT = (
+    "다음은 하나의 YouTube 영상 자막 중 연속된 구간들을 정리한 내용입니다. "
+    "중요한 내용을 빠뜨리지 말고 하나의 정리로 간결하게 합쳐주세요. "
+    "응답은 무조건 한글로 응답하세요.\n\n"
+    "구간별 정리 : \n{text}\n\n"
+    "정리:"
+)
+
+# map-reduce 요약 설정
+# 자막 길이(문자 수)가 MAP_REDUCE_MIN_LENGTH 를 넘으면 구간별로 나누어 요약함
+MAP_REDUCE_MIN_LENGTH = 6000
+CHUNK_TOKEN_BUDGET = 1500
+MAX_CONCURRENT_CHUNKS = 4
+
+# async 파이프라인 설정
+# 자막 라이브러리는 동기 방식이라 별도 스레드 풀에서 실행하고, Ollama 호출은 공유 커넥션 풀을 사용함
+TRANSCRIPT_FETCH_WORKERS = 8
+OLLAMA_MAX_CONNECTIONS = 16
+OLLAMA_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+transcript_executor = ThreadPoolExecutor(max_workers=TRANSCRIPT_FETCH_WORKERS, thread_name_prefix="transcript")
+_async_client: Optional[httpx.AsyncClient] = None
+
+def summary_fingerprint() -> str:
+    """
+    요약 결과에 영향을 주는 프롬프트 템플릿과 옵션의 해시 (요약 캐시 키에 사용)
+    """
+    raw = json.dumps(
+        {
+            "prompts" : [SUMMARY_PROMPT, CHUNK_SUMMARY_PROMPT, REDUCE_SUMMARY_PROMPT, MERGE_SUMMARY_PROMPT],
+            "options" : OLLAMA_OPTIONS,
+            "map_reduce" : [MAP_REDUCE_MIN_LENGTH, CHUNK_TOKEN_BUDGET],
+        },
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 def extract_video_id(youtube_url:str) -> str:
     """
@@ -32,139 +122,529 @@ def extract_video_id(youtube_url:str) -> str:
     
     raise ValueError("올바르지 않은 YouTube URL입니다.")
 
-def get_transcript(video_id: str) -> Union[str, Dict[str, str]]:
+def find_transcript(transcript_list, languages: Sequence[str]):
     """
-    YouTube 영상의 자막을 가져옵니다 (한국어 우선, 영어 fallback)
+    언어 우선순위에 따라 자막 선택 (수동 자막 우선, 자동 생성 자막 fallback)
     """
-    try:
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-
-        try:
-            transcript = transcript_list.find_transcript(['ko', 'ko-KR'])
-            logger.info("한국어 자막을 찾았습니다.")
-        except NoTranscriptFound:
+    last_error = None
+    for finder, label in (
+        (transcript_list.find_transcript, ""),
+        (transcript_list.find_generated_transcript, "자동 생성된 "),
+    ):
+        for language in languages:
             try:
-                transcript = transcript_list.find_transcript(['en', 'en-US','en-GB'])
-                logger.info("영어 자막을 사용합니다.")
-            except NoTranscriptFound:
-                try:
-                    transcript = transcript_list.find_generated_transcript(['ko','ko-KR'])
-                    logger.info("자동 생성된 한국어 자막을 사용합니다.")
-                except NoTranscriptFound:
-                    transcript = transcript_list.find_generated_transcript(['en','en-US'])
-                    logger.info("자동 생성된 영어 자막을 사용합니다.")
-        
-        transcript_data = transcript.fetch()
-
-        try:
-            if isinstance(transcript_data, list) and len(transcript_data) > 0:
-                if isinstance(transcript_data[0], dict):
-                    full_text = " ".join([entry.get('text', '') for entry in transcript_data])
-                else:
-                    formatter = TextFormatter()
-                    full_text = formatter.format_transcript(transcript_data)
+                transcript = finder(TRANSCRIPT_LANGUAGE_CODES.get(language, [language]))
+                logger.info(f"{label}{language} 자막을 사용합니다.")
+                return transcript
+            except NoTranscriptFound as e:
+                last_error = e
+
+    raise last_error
+
+def fetch_transcript_text(video_id: str, languages: Sequence[str]) -> str:
+    """
+    YouTube 에서 자막을 가져와 하나의 텍스트로 변환
+    """
+    transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+    transcript = find_transcript(transcript_list, languages)
+    transcript_data = transcript.fetch()
+
+    try:
+        if isinstance(transcript_data, list) and len(transcript_data) > 0:
+            if isinstance(transcript_data[0], dict):
+                full_text = " ".join([entry.get('text', '') for entry in transcript_data])
             else:
-                full_text = str(transcript_data)
-        except Exception as format_error:
-            logger.error(f"자막 포맷팅 오류 : {str(format_error)}")
+                formatter = TextFormatter()
+                full_text = formatter.format_transcript(transcript_data)
+        else:
             full_text = str(transcript_data)
+    except Exception as format_error:
+        logger.error(f"자막 포맷팅 오류 : {str(format_error)}")
+        full_text = str(transcript_data)
+
+    return full_text.strip()
+
+def get_transcript(video_id: str,
+                   languages: Sequence[str] = DEFAULT_TRANSCRIPT_LANGUAGES) -> Union[str, Dict[str, str]]:
+    """
+    YouTube 영상의 자막을 가져옵니다 (한국어 우선, 영어 fallback)
+    결과는 transcript_cache 에 저장되며, 자막이 없거나 볼 수 없는(삭제/비공개) 영상은 짧은 기간 동안 에러를 캐시함
+    """
+    cached = transcript_cache.get(video_id, languages)
+    if cached is not None:
+        logger.info(f"자막 캐시 적중 : {video_id}")
+        CACHE_REQUESTS.labels("transcript", "negative_hit" if isinstance(cached, dict) else "hit").inc()
+        return cached
+    CACHE_REQUESTS.labels("transcript", "miss").inc()
 
-        return full_text.strip()
+    try:
+        with track_stage("get_transcript"):
+            full_text = fetch_transcript_text(video_id, languages)
+        transcript_cache.set(video_id, languages, full_text)
+        return full_text
 
     except TranscriptsDisabled:
-        return {"error" : "이 영상은 자막이 비활성화되어 있습니다."}
+        UPSTREAM_ERRORS.labels("youtube", "transcripts_disabled").inc()
+        error = {"error" : "이 영상은 자막이 비활성화되어 있습니다."}
+        transcript_cache.set_negative(video_id, languages, error)
+        return error
     except NoTranscriptFound:
-        return {"error" : "이 영상에는 사용 가능한 자막이 없습니다."}
+        UPSTREAM_ERRORS.labels("youtube", "no_transcript").inc()
+        error = {"error" : "이 영상에는 사용 가능한 자막이 없습니다."}
+        transcript_cache.set_negative(video_id, languages, error)
+        return error
+    except VideoUnavailable:
+        UPSTREAM_ERRORS.labels("youtube", "video_unavailable").inc()
+        error = {"error" : "영상을 찾을 수 없거나 비공개 영상입니다."}
+        transcript_cache.set_negative(video_id, languages, error)
+        return error
     except Exception as e:
+        UPSTREAM_ERRORS.labels("youtube", "other").inc()
         logger.error(f"자막 추출 중 오류 : {str(e)}")
         return {"error" : f"자막을 가져오는 중 오류 발생 : {str(e)}"}
     
-def summarize_text(text: str) -> Union[str, Dict[str, str]]:
+def estimate_tokens(text: str) -> int:
     """
-    LLM 모델로 텍스트 요약
+    토크나이저 없이 토큰 수를 대략적으로 계산
+    (한글 등 비 ASCII 문자는 1자당 1토큰, ASCII 는 4자당 1토큰으로 계산)
     """
-    try:
-        prompt = (
-            "다음은 YouTube 영상의 자막입니다. 핵심 내용을 3~5개의 주요 포인트로 요약해주세요. "
-            "응답은 무조건 한글로 응답하세요. "
-            "각 포인트는 명확하고 구체적으로 작성해주세요.\n\n"
-            f"자막 내용 : \n{text}\n\n"
-            "요약:"
-        )
+    return approx_token_count(text)
 
-        payload = {
-            "model" : OLLAMA_MODEL,
-            "prompt" : prompt,
-            "stream" : False,
-            "options" : {
-                "temperature" : 0.7,
-                "top_p" : 0.9,
-                "max_tokens" : 1000
-            }
-        }
+def text_token_budget(template: str, **kwargs) -> int:
+    """
+    응답 토큰(max_tokens)과 template 자체를 제외하고 num_ctx 안에 넣을 수 있는 text 의 토큰 수
+    """
+    counter = get_token_counter(OLLAMA_TOKENIZER)
+    template_tokens = counter.count(template.format(text="", **kwargs))
+    return OLLAMA_NUM_CTX - OLLAMA_OPTIONS["max_tokens"] - template_tokens
+
+def build_prompt(template: str, text: str, **kwargs) -> str:
+    """
+    template 에 text 를 넣어 프롬프트를 만듦
+    응답 토큰(max_tokens)을 제외한 num_ctx 를 넘으면 text 의 뒷부분을 잘라냄
+    """
+    counter = get_token_counter(OLLAMA_TOKENIZER)
+    budget = text_token_budget(template, **kwargs)
+    text_tokens = counter.count(text)
+    if text_tokens > budget:
+        logger.warning(f"프롬프트가 num_ctx 를 넘어 잘라냅니다 : text {text_tokens} -> {budget} 토큰")
+        text = counter.fit_text(text, budget)
+    return template.format(text=text, **kwargs)
+
+def split_transcript(text: str, token_budget: int = CHUNK_TOKEN_BUDGET) -> List[str]:
+    """
+    자막을 token_budget 이하의 구간으로 나눔 (단어 경계 기준)
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
 
-        response = requests.post(
-            OLLAMA_ENDPOINT,
-            json=payload,
-            timeout=60
+    for word in text.split():
+        word_tokens = estimate_tokens(word)
+        if current and current_tokens + word_tokens > token_budget:
+            chunks.append(" ".join(current))
+            current = []
+            current_tokens = 0
+        current.append(word)
+        current_tokens += word_tokens
+
+    if current:
+        chunks.append(" ".join(current))
+
+    return chunks
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Ollama 호출에 사용하는 공유 httpx.AsyncClient (커넥션 풀 재사용)
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=OLLAMA_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_MAX_CONNECTIONS
+            )
         )
+    return _async_client
+
+async def close_async_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+async def get_transcript_async(video_id: str,
+                               languages: Sequence[str] = DEFAULT_TRANSCRIPT_LANGUAGES,
+                               limiter: Optional[asyncio.Semaphore] = None) -> Union[str, Dict[str, str]]:
+    """
+    get_transcript 를 transcript_executor 에서 실행하여 이벤트 루프를 막지 않음
+    limiter 가 주어지면 동시에 실행되는 자막 조회 수를 제한함
+    """
+    loop = asyncio.get_running_loop()
+    async with limiter or contextlib.nullcontext():
+        return await loop.run_in_executor(transcript_executor, get_transcript, video_id, languages)
+
+def ollama_payload(prompt: str, stream: bool) -> Dict[str, Any]:
+    return {
+        "model" : OLLAMA_MODEL,
+        "prompt" : prompt,
+        "stream" : stream,
+        "options" : OLLAMA_OPTIONS
+    }
+
+def ollama_error(error: Exception) -> Dict[str, str]:
+    """
+    Ollama 호출 중 발생한 예외를 에러 응답으로 변환하고 UPSTREAM_ERRORS 에 기록
+    """
+    if isinstance(error, httpx.TimeoutException):
+        UPSTREAM_ERRORS.labels("ollama", "timeout").inc()
+        logger.error("Ollama API 타임아웃")
+        return {"error" : "요약 생성 시간이 초과되었습니다."}
+    if isinstance(error, httpx.ConnectError):
+        UPSTREAM_ERRORS.labels("ollama", "connection").inc()
+        logger.error("Ollama API 연결 오류")
+        return {"error" : "LLM 서비스에 연결할 수 없습니다. Ollama가 실행 중인지 확인해주세요."}
+    UPSTREAM_ERRORS.labels("ollama", "other").inc()
+    logger.error(f"요약 생성 중 오류 : {str(error)}")
+    return {"error" : f"요약 생성 중 오류 발생 : {str(error)}"}
+
+async def request_ollama_async(prompt: str,
+                               limiter: Optional[asyncio.Semaphore] = None) -> Union[str, Dict[str, str]]:
+    """
+    Ollama /api/generate 비동기 호출
+    limiter 가 주어지면 동시에 실행되는 LLM 호출 수를 제한함
+    """
+    try:
+        async with limiter or contextlib.nullcontext():
+            with track_stage("ollama_generate"):
+                response = await get_async_client().post(OLLAMA_ENDPOINT, json=ollama_payload(prompt, stream=False))
 
         if response.status_code != 200:
+            UPSTREAM_ERRORS.labels("ollama", "http_status").inc()
             logger.error(f"Ollama API 오류 : {response.status_code} - {response.text}")
             return {"error" : f"요약 생성 중 오류 발생 : HTTP {response.status_code}"}
-        
+
         result = response.json()
         summary = result.get("response", "").strip()
 
         if not summary:
             return {"error" : "요약을 생성할 수 없습니다."}
-        
+
         return summary
-    
-    except requests.exceptions.Timeout:
-        logger.error("Ollama API 타임아웃")
-        return {"error" : "요약 생성 시간이 초과되었습니다."}
-    except requests.exceptions.ConnectionError:
-        logger.error("Ollama API 연결 오류")
-        return {"error" : "LLM 서비스에 연결할 수 없습니다. Ollama가 실행 중인지 확인해주세요."}
+
     except Exception as e:
-        logger.error(f"요약 생성 중 오류 : {str(e)}")
-        return {"error" : f"요약 생성 중 오류 발생 : {str(e)}"}
-    
-def process_youtube_summary(youtube_url : str) -> Dict[str, Union[str, Dict]]:
+        return ollama_error(e)
+
+class OllamaStreamError(RuntimeError):
+    """
+    스트리밍 중 Ollama 가 보낸 오류 (HTTP 오류 상태 또는 스트림 안의 error). 메시지는 그대로 클라이언트에 전달함
+    """
+
+async def stream_ollama_async(prompt: str) -> AsyncIterator[str]:
+    """
+    Ollama 스트리밍 /api/generate 호출. 생성되는 토큰을 순서대로 반환함.
+    Ollama 가 오류를 보내면 OllamaStreamError, 연결 문제는 httpx.HTTPError 를 발생시킴
+    """
+    with track_stage("ollama_generate"):
+        async with get_async_client().stream("POST", OLLAMA_ENDPOINT, json=ollama_payload(prompt, stream=True)) as response:
+            if response.status_code != 200:
+                UPSTREAM_ERRORS.labels("ollama", "http_status").inc()
+                body = await response.aread()
+                logger.error(f"Ollama API 오류 : {response.status_code} - {body.decode('utf-8', 'replace')}")
+                raise OllamaStreamError(f"요약 생성 중 오류 발생 : HTTP {response.status_code}")
+
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    UPSTREAM_ERRORS.labels("ollama", "stream").inc()
+                    logger.error(f"Ollama 스트리밍 오류 : {data['error']}")
+                    raise OllamaStreamError(f"요약 생성 중 오류 발생 : {data['error']}")
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+def is_error(value: Any) -> bool:
+    return isinstance(value, dict) and "error" in value
+
+async def get_cached_summary(video_id: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    요약 캐시 조회. (캐시 키, 캐시된 결과 또는 None) 을 반환함
+    SQLite 조회 (적중 시 UPDATE 포함) 는 worker 스레드에서 실행하여 이벤트 루프를 막지 않음
+    """
+    cache_key = make_cache_key(video_id, OLLAMA_MODEL, summary_fingerprint())
+    cached = await asyncio.to_thread(summary_cache.get, cache_key)
+    if cached is not None:
+        logger.info(f"요약 캐시 적중 : {video_id}")
+    CACHE_REQUESTS.labels("summary", "hit" if cached is not None else "miss").inc()
+    return cache_key, cached
+
+def check_transcript(transcript: Union[str, Dict[str, str]]) -> Optional[Dict[str, str]]:
+    """
+    요약할 수 없는 자막이면 에러 응답을 반환함
+    """
+    if is_error(transcript):
+        return transcript
+    if len(transcript.strip()) < 50:
+        return {"error" : "자막이 너무 짧거나 비어있습니다."}
+    return None
+
+def plan_summary(transcript: str) -> Tuple[str, List[str]]:
+    """
+    요약 방식(single / map_reduce)을 정하고 LLM 에 보낼 첫 프롬프트들을 만듦
+    single 은 요약 프롬프트 1개, map_reduce 는 구간별 정리 프롬프트 목록을 반환함
+    """
+    with track_stage("build_prompt"):
+        chunks = split_transcript(transcript) if len(transcript) > MAP_REDUCE_MIN_LENGTH else [transcript]
+        if len(chunks) == 1:
+            return "single", [build_prompt(SUMMARY_PROMPT, transcript)]
+        return "map_reduce", [
+            build_prompt(CHUNK_SUMMARY_PROMPT, chunk, index=i + 1, total=len(chunks))
+            for i, chunk in enumerate(chunks)
+        ]
+
+async def save_summary(cache_key: str, video_id: str, transcript: str, summary: str, mode: str) -> Dict[str, Any]:
+    """
+    요약 결과를 만들어 요약 캐시에 저장함 (저장과 eviction 은 worker 스레드에서 실행)
+    """
+    result = {
+        "video_id" : video_id,
+        "transcript_length" : len(transcript),
+        "summary" : summary,
+        "mode" : mode,
+        "status" : "success"
+    }
+    await asyncio.to_thread(summary_cache.set, cache_key, video_id, OLLAMA_MODEL, result)
+    return result
+
+async def summarize_chunks_async(prompts: List[str],
+                                 llm_limiter: Optional[asyncio.Semaphore] = None) -> AsyncIterator[Tuple[int, Union[str, Dict[str, str]]]]:
+    """
+    구간 요약(map)을 MAX_CONCURRENT_CHUNKS 개씩 동시에 실행하고 끝나는 순서대로 (index, 요약) 을 반환함
+    중간에 반복을 멈추면 남은 구간 요약은 취소됨
+    """
+    logger.info(f"map-reduce 요약 : {len(prompts)}개 구간, 동시 요청 {MAX_CONCURRENT_CHUNKS}개")
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+    async def summarize_chunk(index: int, prompt: str) -> Tuple[int, Union[str, Dict[str, str]]]:
+        async with semaphore:
+            return index, await request_ollama_async(prompt, llm_limiter)
+
+    tasks = [asyncio.ensure_future(summarize_chunk(i, prompt)) for i, prompt in enumerate(prompts)]
+    try:
+        for future in asyncio.as_completed(tasks):
+            yield await future
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def join_sections(sections: Sequence[Tuple[str, str]]) -> str:
+    return "\n\n".join(f"[구간 {label}]\n{text}" for label, text in sections)
+
+def batch_sections(sections: List[Tuple[str, str]], token_budget: int) -> List[List[Tuple[str, str]]]:
+    """
+    연속된 구간 정리를 token_budget 이하의 묶음으로 나눔
+    묶음마다 구간이 최소 2개는 들어가도록 하여 합칠 때마다 구간 수가 줄어들게 함
+    """
+    counter = get_token_counter(OLLAMA_TOKENIZER)
+    batches = []
+    current = []
+    current_tokens = 0
+
+    for section in sections:
+        section_tokens = counter.count(join_sections([section])) + 1
+        if len(current) >= 2 and current_tokens + section_tokens > token_budget:
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(section)
+        current_tokens += section_tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+async def build_reduce_prompt(chunk_summaries: List[str],
+                              llm_limiter: Optional[asyncio.Semaphore] = None) -> Union[str, Dict[str, str]]:
+    """
+    구간 요약들로 최종 요약(reduce) 프롬프트를 만듦
+
+    구간 요약을 모두 합친 내용이 프롬프트에 들어가지 않으면 잘라내지 않고,
+    연속된 구간을 프롬프트 크기의 묶음으로 나누어 MERGE_SUMMARY_PROMPT 로 합치는 과정을
+    전체가 한 프롬프트에 들어갈 때까지 반복함
+    """
+    counter = get_token_counter(OLLAMA_TOKENIZER)
+    sections = [(str(i + 1), chunk_summary) for i, chunk_summary in enumerate(chunk_summaries)]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+    async def merge(batch: List[Tuple[str, str]]) -> Tuple[str, Union[str, Dict[str, str]]]:
+        label = f"{batch[0][0].split('-')[0]}-{batch[-1][0].split('-')[-1]}"
+        async with semaphore:
+            return label, await request_ollama_async(build_prompt(MERGE_SUMMARY_PROMPT, join_sections(batch)), llm_limiter)
+
+    while len(sections) > 1 and counter.count(join_sections(sections)) > text_token_budget(REDUCE_SUMMARY_PROMPT):
+        batches = batch_sections(sections, text_token_budget(MERGE_SUMMARY_PROMPT))
+        logger.info(f"구간 정리가 프롬프트보다 길어 {len(sections)}개 구간을 {len(batches)}개 묶음으로 합칩니다.")
+        merged = await asyncio.gather(
+            *(merge(batch) if len(batch) > 1 else asyncio.sleep(0, batch[0]) for batch in batches)
+        )
+        for _, text in merged:
+            if is_error(text):
+                return text
+        sections = list(merged)
+
+    return build_prompt(REDUCE_SUMMARY_PROMPT, join_sections(sections))
+
+async def summarize_async(mode: str, prompts: List[str],
+                          llm_limiter: Optional[asyncio.Semaphore] = None) -> Union[str, Dict[str, str]]:
+    """
+    plan_summary 가 만든 프롬프트로 요약을 생성함
+    map_reduce 는 구간별로 동시에 요약(map)한 뒤 하나의 요약으로 합침(reduce)
+    """
+    with track_stage("summarize_text"):
+        if mode == "single":
+            return await request_ollama_async(prompts[0], llm_limiter)
+
+        chunk_summaries = [None] * len(prompts)
+        async for index, chunk_summary in summarize_chunks_async(prompts, llm_limiter):
+            if is_error(chunk_summary):
+                return chunk_summary
+            chunk_summaries[index] = chunk_summary
+
+        prompt = await build_reduce_prompt(chunk_summaries, llm_limiter)
+        if is_error(prompt):
+            return prompt
+        return await request_ollama_async(prompt, llm_limiter)
+
+async def process_youtube_summary_async(youtube_url : str,
+                                        transcript_limiter: Optional[asyncio.Semaphore] = None,
+                                        llm_limiter: Optional[asyncio.Semaphore] = None) -> Dict[str, Union[str, Dict]]:
     """
     YouTube URL을 받아서 자막을 추출하고 요약을 생성함.
+    transcript_limiter / llm_limiter 로 자막 조회와 LLM 호출의 동시 실행 수를 따로 제한할 수 있음
     """
     try:
         if not youtube_url or not isinstance(youtube_url, str):
             return {"error" : "올바른 YouTube URL을 입력해주세요."}
-        
-        youtube_url = youtube_url.strip()
-
-        video_id = extract_video_id(youtube_url)
-        transcript = get_transcript(video_id)
-        if isinstance(transcript, dict) and "error" in transcript:
-            return transcript
-        
-        if len(transcript.strip()) < 50:
-            return {"error" : "자막이 너무 짧거나 비어있습니다."}
-        
-        summary = summarize_text(transcript)
-        if isinstance(summary, dict) and "error" in summary:
+
+        video_id = extract_video_id(youtube_url.strip())
+
+        cache_key, cached = await get_cached_summary(video_id)
+        if cached is not None:
+            return {**cached, "cache" : "hit"}
+
+        transcript = await get_transcript_async(video_id, limiter=transcript_limiter)
+        error = check_transcript(transcript)
+        if error is not None:
+            return error
+
+        mode, prompts = plan_summary(transcript)
+        summary = await summarize_async(mode, prompts, llm_limiter)
+        if is_error(summary):
             return summary
-        
-        return {
+
+        result = await save_summary(cache_key, video_id, transcript, summary, mode)
+        return {**result, "cache" : "miss"}
+
+    except ValueError as e:
+        return {"error" : str(e)}
+    except Exception as e:
+        return {"error" : f"처리 중 오류 발생 : {str(e)}"}
+
+async def stream_youtube_summary(youtube_url : str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    요약 진행 상황과 요약 토큰을 (event, data) 형태로 순서대로 반환함 (SSE 라우터에서 사용)
+
+    event 종류 : transcript, chunk, token, done, error
+    마지막 done 이벤트에 첫 토큰까지 걸린 시간(ttft_ms)과 전체 소요 시간(total_ms)을 포함함
+    """
+    started = time.perf_counter()
+    first_token_at = None
+
+    def elapsed_ms(at: float) -> float:
+        return round((at - started) * 1000, 1)
+
+    try:
+        video_id = extract_video_id(youtube_url.strip())
+
+        cache_key, cached = await get_cached_summary(video_id)
+        if cached is not None:
+            first_token_at = time.perf_counter()
+            yield "token", {"text" : cached["summary"]}
+            yield "done", {
+                **cached,
+                "cache" : "hit",
+                "ttft_ms" : elapsed_ms(first_token_at),
+                "total_ms" : elapsed_ms(time.perf_counter())
+            }
+            return
+
+        transcript = await get_transcript_async(video_id)
+        error = check_transcript(transcript)
+        if error is not None:
+            yield "error", error
+            return
+
+        mode, prompts = plan_summary(transcript)
+        yield "transcript", {
             "video_id" : video_id,
             "transcript_length" : len(transcript),
-            "summary" : summary,
-            "status" : "success"
+            "mode" : mode,
+            "chunk_count" : len(prompts)
         }
-    
+
+        # summarize_async 와 같은 단계를 진행 이벤트와 함께 실행함 (summarize_text 는 마지막 토큰까지)
+        tokens = []
+        with track_stage("summarize_text"):
+            if mode == "map_reduce":
+                chunk_summaries = [None] * len(prompts)
+                completed = 0
+                async for index, chunk_summary in summarize_chunks_async(prompts):
+                    if is_error(chunk_summary):
+                        yield "error", chunk_summary
+                        return
+                    chunk_summaries[index] = chunk_summary
+                    completed += 1
+                    yield "chunk", {"index" : index + 1, "completed" : completed, "total" : len(prompts)}
+                prompt = await build_reduce_prompt(chunk_summaries)
+                if is_error(prompt):
+                    yield "error", prompt
+                    return
+            else:
+                prompt = prompts[0]
+
+            async for token in stream_ollama_async(prompt):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                tokens.append(token)
+                yield "token", {"text" : token}
+
+        summary = "".join(tokens).strip()
+        if not summary:
+            yield "error", {"error" : "요약을 생성할 수 없습니다."}
+            return
+
+        result = await save_summary(cache_key, video_id, transcript, summary, mode)
+        yield "done", {
+            **result,
+            "cache" : "miss",
+            "ttft_ms" : elapsed_ms(first_token_at),
+            "total_ms" : elapsed_ms(time.perf_counter())
+        }
+
     except ValueError as e:
-        return {"error" : str(e)}
+        yield "error", {"error" : str(e)}
+    except httpx.HTTPError as e:
+        yield "error", ollama_error(e)
+    except OllamaStreamError as e:
+        yield "error", {"error" : str(e)}
     except Exception as e:
-        return {"error" : f"처리 중 오류 발생 : {str(e)}"}
-    
+        logger.error(f"스트리밍 요약 중 오류 : {str(e)}")
+        yield "error", {"error" : f"처리 중 오류 발생 : {str(e)}"}
+
 def validate_youtube_url(url: str) -> bool:
     try:
         extract_video_id(url)
@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", os.path.join(BASE_DIR, "cache", "summary_cache.db"))
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", 7 * 24 * 60 * 60))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 10000))
+
+def make_cache_key(video_id: str, model: str, fingerprint: str) -> str:
+    """
+    video_id + 모델명 + 프롬프트/옵션 해시로 캐시 키 생성
+    """
+    raw = f"{video_id}:{model}:{fingerprint}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class SummaryCache:
+    """
+    SQLite 기반 요약 캐시 (TTL 만료 + LRU 삭제)
+    """
+
+    def __init__(self,
+                 path: str = SUMMARY_CACHE_PATH,
+                 ttl: int = SUMMARY_CACHE_TTL,
+                 max_entries: int = SUMMARY_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                video_id TEXT NOT NULL,
+                model TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries (accessed_at)")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        캐시 조회. 만료된 항목은 삭제하고 None 을 반환함.
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM summaries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+
+                value, created_at = row
+                if now - created_at > self.ttl:
+                    self._conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                    return None
+
+                self._conn.execute("UPDATE summaries SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(value)
+        except Exception as e:
+            logger.error(f"요약 캐시 조회 오류 : {str(e)}")
+            return None
+
+    def set(self, key: str, video_id: str, model: str, value: Dict[str, Any]) -> None:
+        """
+        캐시 저장 후 만료 항목과 오래 사용되지 않은 항목을 정리함.
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO summaries (key, video_id, model, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, video_id, model, json.dumps(value, ensure_ascii=False), now, now)
+                )
+                self._evict(now)
+        except Exception as e:
+            logger.error(f"요약 캐시 저장 오류 : {str(e)}")
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM summaries WHERE created_at < ?", (now - self.ttl,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM summaries WHERE key IN "
+                "(SELECT key FROM summaries ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM summaries")
+
+summary_cache = SummaryCache()
@@ -0,0 +1,139 @@
+import time
+import uuid
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.summarize_service import extract_video_id, process_youtube_summary_async
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_JOB_WORKERS = 4
+SUMMARY_JOB_MAX_PENDING = 100
+SUMMARY_JOB_RESULT_TTL = 60 * 60
+
+class SummaryJob:
+    """
+    요약 작업 상태 (queued -> running -> done / failed)
+    """
+
+    def __init__(self, video_id: str, url: str):
+        self.job_id = uuid.uuid4().hex
+        self.video_id = video_id
+        self.url = url
+        self.status = "queued"
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.subscribers = 1
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id" : self.job_id,
+            "video_id" : self.video_id,
+            "status" : self.status,
+            "subscribers" : self.subscribers,
+            "result" : self.result,
+            "error" : self.error,
+            "created_at" : self.created_at,
+            "finished_at" : self.finished_at
+        }
+
+class SummaryJobManager:
+    """
+    요약 작업 큐
+
+    고정된 수의 worker 가 작업을 처리하고, 같은 video_id 로 동시에 들어온 요청은
+    진행 중인 하나의 작업에 합쳐짐 (single-flight)
+    """
+
+    def __init__(self,
+                 processor: Callable[[str], Awaitable[Dict[str, Any]]] = process_youtube_summary_async,
+                 workers: int = SUMMARY_JOB_WORKERS,
+                 max_pending: int = SUMMARY_JOB_MAX_PENDING,
+                 result_ttl: int = SUMMARY_JOB_RESULT_TTL):
+        self.processor = processor
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, SummaryJob] = {}
+        self._inflight: Dict[str, SummaryJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._worker_tasks = [task for task in self._worker_tasks if not task.done()]
+        while len(self._worker_tasks) < self.workers:
+            self._worker_tasks.append(asyncio.create_task(self._worker()))
+
+    def submit(self, youtube_url: str) -> SummaryJob:
+        """
+        작업 등록. 같은 video_id 의 작업이 진행 중이면 그 작업을 반환함.
+
+        Raises:
+            ValueError: 올바르지 않은 URL
+            RuntimeError: 대기 중인 작업이 너무 많음
+        """
+        video_id = extract_video_id(youtube_url.strip())
+        self._prune()
+
+        job = self._inflight.get(video_id)
+        if job is not None:
+            job.subscribers += 1
+            logger.info(f"진행 중인 요약 작업에 합류 : {video_id} ({job.job_id})")
+            return job
+
+        self._ensure_workers()
+        job = SummaryJob(video_id, youtube_url.strip())
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise RuntimeError("대기 중인 요약 작업이 너무 많습니다. 잠시 후 다시 시도해주세요.")
+
+        self._jobs[job.job_id] = job
+        self._inflight[video_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[SummaryJob]:
+        return self._jobs.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            try:
+                result = await self.processor(job.url)
+                if "error" in result:
+                    job.status = "failed"
+                    job.error = result["error"]
+                else:
+                    job.status = "done"
+                    job.result = result
+            except Exception as e:
+                logger.error(f"요약 작업 처리 중 오류 : {str(e)}")
+                job.status = "failed"
+                job.error = f"처리 중 오류 발생 : {str(e)}"
+            finally:
+                job.finished_at = time.time()
+                self._inflight.pop(job.video_id, None)
+                self._queue.task_done()
+
+    def _prune(self) -> None:
+        expire_before = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < expire_before
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def shutdown(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+summary_job_manager = SummaryJobManager()
@@ -0,0 +1,66 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_CACHE_TTL = int(os.getenv("TRANSCRIPT_CACHE_TTL", 6 * 60 * 60))
+TRANSCRIPT_NEGATIVE_TTL = int(os.getenv("TRANSCRIPT_NEGATIVE_TTL", 10 * 60))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", 1000))
+
+class TranscriptCache:
+    """
+    (video_id, 언어) 별로 평탄화된 자막 텍스트를 저장하는 메모리 캐시
+    자막이 없거나 볼 수 없는 영상은 에러 응답을 짧은 TTL 로 저장함 (negative caching)
+    """
+
+    def __init__(self,
+                 ttl: int = TRANSCRIPT_CACHE_TTL,
+                 negative_ttl: int = TRANSCRIPT_NEGATIVE_TTL,
+                 max_entries: int = TRANSCRIPT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Tuple[str, ...]], Tuple[float, Union[str, Dict[str, str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(video_id: str, languages: Sequence[str]) -> Tuple[str, Tuple[str, ...]]:
+        return video_id, tuple(languages)
+
+    def get(self, video_id: str, languages: Sequence[str]) -> Optional[Union[str, Dict[str, str]]]:
+        key = self._key(video_id, languages)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+        return dict(value) if isinstance(value, dict) else value
+
+    def set(self, video_id: str, languages: Sequence[str], text: str) -> None:
+        self._store(self._key(video_id, languages), text, self.ttl)
+
+    def set_negative(self, video_id: str, languages: Sequence[str], error: Dict[str, str]) -> None:
+        self._store(self._key(video_id, languages), dict(error), self.negative_ttl)
+
+    def _store(self, key, value, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+transcript_cache = TranscriptCache()
@@ -1,9 +1,75 @@
 import json
+import time
+import asyncio
 import logging
-from typing import List
+import sys
+import threading
+from typing import Any, Dict, List, Optional
 
-from server import Server
+from server import Server, is_permanent_startup_error
+from circuit_breaker import backoff_delay
+from history import ConversationHistory
 from llm_client import LLMClient
+from tool_call_parser import ToolCallDetector, parse_tool_calls
+from tool_cache import tool_result_cache
+from tool_index import ToolIndex
+
+# Background retry of servers that failed to start
+SERVER_RETRY_INITIAL_DELAY = 2.0
+SERVER_RETRY_MAX_DELAY = 60.0
+SERVER_RETRY_MAX_ATTEMPTS = 8
+# Tool calls from one LLM turn that may run at the same time
+MAX_CONCURRENT_TOOL_CALLS = 4
+
+
+async def read_input(prompt: str) -> str:
+    """Read a line from stdin without blocking the event loop.
+
+    The line is read when the loop sees stdin become readable, so no thread
+    is left blocked in input() after Ctrl+C; asyncio.run() joins the default
+    executor on shutdown and such a thread would keep the process alive.
+    Loops without add_reader (Windows) fall back to a daemon thread.
+    """
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future = loop.create_future()
+
+    def resolve(value: Any, error: Optional[BaseException]) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def on_readable() -> None:
+        line = sys.stdin.readline()
+        if line:
+            resolve(line.rstrip("\n"), None)
+        else:
+            resolve(None, EOFError())
+
+    def reader() -> None:
+        try:
+            value, error = input(prompt), None
+        except BaseException as e:
+            value, error = None, e
+        try:
+            loop.call_soon_threadsafe(resolve, value, error)
+        except RuntimeError:
+            # The loop already closed; nobody is waiting for this line
+            pass
+
+    try:
+        loop.add_reader(sys.stdin.fileno(), on_readable)
+    except (NotImplementedError, OSError, ValueError):
+        threading.Thread(target=reader, name="stdin-reader", daemon=True).start()
+        return await future
+
+    print(prompt, end="", flush=True)
+    try:
+        return await future
+    finally:
+        loop.remove_reader(sys.stdin.fileno())
 
 
 class ChatSession:
@@ -12,18 +78,191 @@ class ChatSession:
     def __init__(self, servers: List[Server], llm_client: LLMClient) -> None:
         self.servers: List[Server] = servers
         self.llm_client: LLMClient = llm_client
+        self.history: Optional[ConversationHistory] = None
+        self.tool_index: ToolIndex = ToolIndex(servers)
+        self.startup_report: Dict[str, Dict[str, Any]] = {}
+        self._retry_tasks: set[asyncio.Task] = set()
 
     async def cleanup_servers(self) -> None:
-        """Clean up all servers properly."""
+        """Clean up all servers, background tasks and the LLM connection pool."""
+        logging.info(f"Tool result cache: {tool_result_cache.stats()}")
+        logging.info(f"Server health: {self.server_health()}")
+        for task in list(self._retry_tasks):
+            task.cancel()
+        await asyncio.gather(*self._retry_tasks, return_exceptions=True)
+        if self.history is not None:
+            await self.history.aclose()
         for server in reversed(self.servers):
             try:
                 await server.cleanup()
             except Exception as e:
                 logging.warning(f"Warning during final cleanup: {e}")
+        try:
+            await self.llm_client.aclose()
+        except Exception as e:
+            logging.warning(f"Warning while closing LLM client: {e}")
+
+    def server_health(self) -> Dict[str, Dict[str, Any]]:
+        """Connection, reconnect and circuit breaker state of every server."""
+        return {server.name: server.health() for server in self.servers}
+
+    async def stream_llm_response(self, messages: List[dict], label: str) -> str:
+        """Print the LLM reply as it streams, stopping early at a complete tool call.
+
+        Args:
+            messages: The conversation history.
+            label: Prefix printed before the reply.
+
+        Returns:
+            The full reply, or only the tool-call JSON when one was detected.
+        """
+        detector = ToolCallDetector()
+        chunks = []
+        print(f"\n{label}: ", end="", flush=True)
+        stream = self.llm_client.stream_response(messages)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                print(chunk, end="", flush=True)
+                if detector.feed(chunk) is not None:
+                    # Closing the stream cancels the rest of the generation
+                    logging.info(f"Tool call detected: {[call['tool'] for call in detector.tool_calls]}")
+                    return detector.raw_tool_call
+        finally:
+            await stream.aclose()
+            print()
+        return "".join(chunks)
+
+    def build_system_message(self) -> str:
+        """Build the system prompt from the currently routable tools."""
+        all_tools = self.tool_index.tools
+
+        # Create tools description for LLM
+        tools_description = "\n".join([tool.format_for_llm() for tool in all_tools])
+
+        # Log available tools for debugging
+        if all_tools:
+            logging.info(f"Total tools available: {len(all_tools)}")
+            for tool in all_tools:
+                logging.info(f"  - {tool.name}: {tool.description}")
+        else:
+            logging.warning("No tools available!")
+
+        return (
+            "You are a helpful assistant with access to these tools:\n\n"
+            f"{tools_description}\n"
+            "Choose the appropriate tool based on the user's question. "
+            "If no tool is needed, reply directly.\n\n"
+            "IMPORTANT: When you need to use a tool, you must ONLY respond with "
+            "the exact JSON object format below, nothing else:\n"
+            "{\n"
+            '    "tool": "tool-name",\n'
+            '    "arguments": {\n'
+            '        "argument-name": "value"\n'
+            "    }\n"
+            "}\n\n"
+            "If the question needs several independent tool calls, respond with "
+            "a JSON array of such objects instead; they run in parallel:\n"
+            "[\n"
+            '    {"tool": "tool-name", "arguments": {"argument-name": "value"}},\n'
+            '    {"tool": "other-tool", "arguments": {"argument-name": "value"}}\n'
+            "]\n\n"
+            "After receiving a tool's response:\n"
+            "1. Transform the raw data into a natural, conversational response\n"
+            "2. Keep responses concise but informative\n"
+            "3. Focus on the most relevant information\n"
+            "4. Use appropriate context from the user's question\n"
+            "5. Avoid simply repeating the raw data\n\n"
+            "Please use only the tools that are explicitly defined above."
+        )
+
+    async def start_server(self, server: Server) -> bool:
+        """Start one server within its timeout and record how long it took.
+
+        Returns:
+            True if the server is ready.
+        """
+        try:
+            seconds = await server.start()
+            self.startup_report[server.name] = {"status": "ready", "seconds": round(seconds, 3)}
+            logging.info(f"Server '{server.name}' initialized in {seconds:.2f}s")
+            return True
+        except Exception as e:
+            self.startup_report[server.name] = {
+                "status": "failed",
+                "error": server.startup_error or str(e),
+                "permanent": is_permanent_startup_error(e),
+            }
+            logging.error(f"Failed to initialize server '{server.name}': {server.startup_error or e}")
+            return False
+
+    async def retry_server(self, server: Server) -> None:
+        """Restart a failed server in the background until it joins the session.
+
+        Gives up after SERVER_RETRY_MAX_ATTEMPTS retries, or at once when the
+        failure cannot be transient (e.g. the command does not exist).
+        """
+        attempt = 0
+        while attempt < SERVER_RETRY_MAX_ATTEMPTS and not self.startup_report[server.name].get("permanent"):
+            await asyncio.sleep(backoff_delay(attempt, SERVER_RETRY_INITIAL_DELAY, SERVER_RETRY_MAX_DELAY))
+            attempt += 1
+            if await self.start_server(server):
+                self.startup_report[server.name]["attempts"] = attempt + 1
+                await self.on_tools_changed(server)
+                logging.info(f"Server '{server.name}' joined the session after {attempt} retries")
+                return
+
+        self.startup_report[server.name]["attempts"] = attempt + 1
+        logging.error(
+            f"Giving up on server '{server.name}' after {attempt + 1} attempts: "
+            f"{self.startup_report[server.name]['error']}"
+        )
+
+    async def on_tools_changed(self, server: Server) -> None:
+        """Refresh the tool index and system prompt after a server's tools change."""
+        await self.tool_index.refresh(server)
+        if self.history is not None:
+            self.history.system_message = self.build_system_message()
+
+    async def execute_tool_call(self, tool_call: Dict[str, Any]) -> tuple[bool, str]:
+        """Run one tool call on the server that provides it.
+
+        Returns:
+            (True, result) on success, otherwise (False, error message).
+        """
+        logging.info(f"Executing tool: {tool_call['tool']}")
+        logging.info(f"With arguments: {tool_call['arguments']}")
+
+        server = self.tool_index.lookup(tool_call["tool"])
+        if server is None:
+            return False, f"No server found with tool: {tool_call['tool']}"
+
+        try:
+            result = await server.execute_tool(
+                tool_call["tool"], tool_call["arguments"]
+            )
+
+            if isinstance(result, dict) and "progress" in result:
+                progress = result["progress"]
+                total = result["total"]
+                percentage = (progress / total) * 100
+                logging.info(
+                    f"Progress: {progress}/{total} ({percentage:.1f}%)"
+                )
+
+            return True, str(result)
+        except Exception as e:
+            error_msg = f"Error executing tool: {str(e)}"
+            logging.error(error_msg)
+            return False, error_msg
 
     async def process_llm_response(self, llm_response: str) -> str:
         """Process the LLM response and execute tools if needed.
 
+        The response may hold one tool call or an array of them. Several calls
+        run concurrently (at most MAX_CONCURRENT_TOOL_CALLS at once) and their
+        results are combined in the order the calls were given.
+
         Args:
             llm_response: The response from the LLM.
 
@@ -31,102 +270,65 @@ class ChatSession:
             The result of tool execution or the original response.
         """
         try:
-            tool_call = json.loads(llm_response)
-            if "tool" in tool_call and "arguments" in tool_call:
-                logging.info(f"Executing tool: {tool_call['tool']}")
-                logging.info(f"With arguments: {tool_call['arguments']}")
-
-                for server in self.servers:
-                    tools = await server.list_tools()
-                    if any(tool.name == tool_call["tool"] for tool in tools):
-                        try:
-                            result = await server.execute_tool(
-                                tool_call["tool"], tool_call["arguments"]
-                            )
-
-                            if isinstance(result, dict) and "progress" in result:
-                                progress = result["progress"]
-                                total = result["total"]
-                                percentage = (progress / total) * 100
-                                logging.info(
-                                    f"Progress: {progress}/{total} ({percentage:.1f}%)"
-                                )
-
-                            return f"Tool execution result: {result}"
-                        except Exception as e:
-                            error_msg = f"Error executing tool: {str(e)}"
-                            logging.error(error_msg)
-                            return error_msg
-
-                return f"No server found with tool: {tool_call['tool']}"
-            return llm_response
+            tool_calls = parse_tool_calls(json.loads(llm_response))
         except json.JSONDecodeError:
             return llm_response
+        if not tool_calls:
+            return llm_response
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_TOOL_CALLS)
+
+        async def run(tool_call: Dict[str, Any]) -> tuple[bool, str]:
+            async with semaphore:
+                return await self.execute_tool_call(tool_call)
+
+        results = await asyncio.gather(*(run(tool_call) for tool_call in tool_calls))
+
+        if len(results) == 1:
+            ok, text = results[0]
+            return f"Tool execution result: {text}" if ok else text
+
+        lines = [
+            f"[{index}] {tool_call['tool']}: {text}"
+            for index, (tool_call, (_, text)) in enumerate(zip(tool_calls, results), start=1)
+        ]
+        return "Tool execution result:\n" + "\n".join(lines)
 
     async def start(self) -> None:
         """Main chat session handler."""
+        # Load the model while the MCP servers start
+        preload_task = asyncio.create_task(self.llm_client.preload())
         try:
-            # Initialize all servers
-            for server in self.servers:
-                try:
-                    await server.initialize()
-                    logging.info(f"Server '{server.name}' initialized successfully")
-                except Exception as e:
-                    logging.error(f"Failed to initialize server '{server.name}': {e}")
-                    await self.cleanup_servers()
-                    return
+            # Start all servers concurrently; the session runs with whichever are healthy
+            started = time.perf_counter()
+            ready = await asyncio.gather(*(self.start_server(server) for server in self.servers))
+            logging.info(
+                f"{sum(ready)}/{len(self.servers)} servers ready in "
+                f"{time.perf_counter() - started:.2f}s: {self.startup_report}"
+            )
 
-            # Collect all available tools
-            all_tools = []
-            for server in self.servers:
-                try:
-                    tools = await server.list_tools()
-                    all_tools.extend(tools)
-                    logging.info(f"Server '{server.name}' has {len(tools)} tools available")
-                except Exception as e:
-                    logging.error(f"Failed to list tools for server '{server.name}': {e}")
+            await preload_task
+            self.llm_client.start_keepalive()
 
-            # Create tools description for LLM
-            tools_description = "\n".join([tool.format_for_llm() for tool in all_tools])
-            
-            # Log available tools for debugging
-            if all_tools:
-                logging.info(f"Total tools available: {len(all_tools)}")
-                for tool in all_tools:
-                    logging.info(f"  - {tool.name}: {tool.description}")
-            else:
-                logging.warning("No tools available!")
-
-            system_message = (
-                "You are a helpful assistant with access to these tools:\n\n"
-                f"{tools_description}\n"
-                "Choose the appropriate tool based on the user's question. "
-                "If no tool is needed, reply directly.\n\n"
-                "IMPORTANT: When you need to use a tool, you must ONLY respond with "
-                "the exact JSON object format below, nothing else:\n"
-                "{\n"
-                '    "tool": "tool-name",\n'
-                '    "arguments": {\n'
-                '        "argument-name": "value"\n'
-                "    }\n"
-                "}\n\n"
-                "After receiving a tool's response:\n"
-                "1. Transform the raw data into a natural, conversational response\n"
-                "2. Keep responses concise but informative\n"
-                "3. Focus on the most relevant information\n"
-                "4. Use appropriate context from the user's question\n"
-                "5. Avoid simply repeating the raw data\n\n"
-                "Please use only the tools that are explicitly defined above."
-            )
+            # Build the tool-name -> server index once; servers refresh it on changes
+            await self.tool_index.rebuild()
+            for server, is_ready in zip(self.servers, ready):
+                server.on_tools_changed = self.on_tools_changed
+                if not is_ready:
+                    task = asyncio.create_task(self.retry_server(server))
+                    self._retry_tasks.add(task)
+                    task.add_done_callback(self._retry_tasks.discard)
+            system_message = self.build_system_message()
 
-            messages = [{"role": "system", "content": system_message}]
+            self.history = ConversationHistory(self.llm_client, system_message)
             
             print("Chat session started! Type 'quit' or 'exit' to end.")
             print("=" * 50)
 
             while True:
                 try:
-                    user_input = input("You: ").strip()
+                    # Read input off the loop so MCP sessions keep running meanwhile
+                    user_input = (await read_input("You: ")).strip()
                     if user_input.lower() in ["quit", "exit"]:
                         logging.info("\nExiting...")
                         print("Goodbye!")
@@ -135,30 +337,34 @@ class ChatSession:
                     if not user_input:
                         continue
 
-                    messages.append({"role": "user", "content": user_input})
+                    # Free Ollama for this turn; the compaction is retried afterwards
+                    self.history.cancel_compaction()
+                    self.history.append({"role": "user", "content": user_input})
 
                     # Get response from LLM
-                    llm_response = self.llm_client.get_response(messages)
-                    print(f"\nAssistant: {llm_response}")
+                    llm_response = await self.stream_llm_response(self.history.messages, "Assistant")
 
                     # Process the response (check if it's a tool call)
                     result = await self.process_llm_response(llm_response)
 
                     if result != llm_response:
                         # Tool was executed, get final response
-                        messages.append({"role": "assistant", "content": llm_response})
-                        messages.append({"role": "system", "content": result})
+                        self.history.append({"role": "assistant", "content": llm_response})
+                        self.history.append({"role": "system", "content": result})
 
-                        final_response = self.llm_client.get_response(messages)
-                        print(f"\nFinal response: {final_response}")
-                        messages.append(
+                        final_response = await self.stream_llm_response(self.history.messages, "Final response")
+                        self.history.append(
                             {"role": "assistant", "content": final_response}
                         )
                     else:
                         # No tool execution, just add the response
-                        messages.append({"role": "assistant", "content": llm_response})
+                        self.history.append({"role": "assistant", "content": llm_response})
+
+                    # Summarize older turns in the background while the user types
+                    self.history.maybe_compact()
 
-                except KeyboardInterrupt:
+                except (KeyboardInterrupt, asyncio.CancelledError):
+                    # Ctrl+C cancels the pending LLM request as well
                     logging.info("\nExiting...")
                     print("\nGoodbye!")
                     break
@@ -167,4 +373,5 @@ class ChatSession:
                     print(f"An error occurred: {e}")
 
         finally:
+            preload_task.cancel()
             await self.cleanup_servers()
\ No newline at end of file
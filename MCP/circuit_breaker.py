@@ -0,0 +1,93 @@
+import random
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 30.0
+
+
+def backoff_delay(attempt: int, base: float, max_delay: float) -> float:
+    """Exponential backoff with jitter for the given 0-based attempt.
+
+    The delay doubles per attempt up to max_delay and is then scaled by a
+    random factor in [0.5, 1.0] so clients retrying together do not stay in
+    lockstep.
+    """
+    delay = min(base * (2 ** attempt), max_delay)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a server whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Fails fast while a server is unhealthy.
+
+    closed: calls go through; failure_threshold consecutive failures open it.
+    open: calls are rejected until reset_timeout seconds have passed.
+    half_open: a single probe call goes through; success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_count = 0
+        self.last_error: Optional[str] = None
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through."""
+        if self.state != "open":
+            return 0.0
+        return max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        """Return True if a call may go through now."""
+        if self.state == "open":
+            if self.retry_after() > 0:
+                return False
+            self.state = "half_open"
+            self._probe_in_flight = False
+
+        if self.state == "half_open":
+            # A probe that never reported back (e.g. cancelled) is replaced after reset_timeout
+            if self._probe_in_flight and time.monotonic() - self._probe_started < self.reset_timeout:
+                return False
+            self._probe_in_flight = True
+            self._probe_started = time.monotonic()
+        return True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, error: Any = None) -> None:
+        self.consecutive_failures += 1
+        if error is not None:
+            self.last_error = str(error) or type(error).__name__
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opened_count += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_count": self.opened_count,
+            "retry_after": round(self.retry_after(), 1),
+            "last_error": self.last_error,
+        }
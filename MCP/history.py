@@ -0,0 +1,157 @@
+import re
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from llm_client import LLMClient
+
+# Token budget for everything except the system prompt
+DEFAULT_HISTORY_TOKEN_BUDGET = 4096
+# Most recent messages that are always sent verbatim
+DEFAULT_KEEP_RECENT_MESSAGES = 6
+# Tool results older than the recent window are cut to this many tokens
+DEFAULT_MAX_TOOL_RESULT_TOKENS = 256
+# Seconds the user must be idle before a compaction starts talking to Ollama
+DEFAULT_COMPACTION_IDLE_DELAY = 2.0
+
+TOOL_RESULT_PREFIX = "Tool execution result:"
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below for your own future reference. "
+    "Keep user goals, decisions, facts and key tool results; drop small talk and raw data. "
+    "Reply with the summary only, at most 200 words.\n\n"
+    "{previous}"
+    "Conversation:\n{conversation}"
+)
+
+
+class ConversationHistory:
+    """Token-budgeted chat history with rolling summaries.
+
+    The system prompt and the most recent messages are kept verbatim. Once the
+    rest grows past the token budget, the older messages are folded into a
+    rolling summary by a background task. The summary is generated by the
+    same Ollama instance that answers the user, so the task waits for an idle
+    delay before starting and is cancelled when the next turn begins (call
+    cancel_compaction()); it is retried after that turn. Until the summary is
+    ready, the full history is sent and LLMClient's prompt packing keeps it
+    within num_ctx.
+    """
+
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        system_message: str,
+        token_budget: int = DEFAULT_HISTORY_TOKEN_BUDGET,
+        keep_recent_messages: int = DEFAULT_KEEP_RECENT_MESSAGES,
+        max_tool_result_tokens: int = DEFAULT_MAX_TOOL_RESULT_TOKENS,
+        idle_delay: float = DEFAULT_COMPACTION_IDLE_DELAY,
+    ) -> None:
+        self.llm_client = llm_client
+        self.system_message = system_message
+        self.token_budget = token_budget
+        self.keep_recent_messages = keep_recent_messages
+        self.max_tool_result_tokens = max_tool_result_tokens
+        self.idle_delay = idle_delay
+        self.summary: Optional[str] = None
+        self.compactions = 0
+        self.deferred_compactions = 0
+        self._turns: List[Dict[str, str]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def messages(self) -> List[Dict[str, str]]:
+        """The messages to send to the LLM for the next turn."""
+        messages = [{"role": "system", "content": self.system_message}]
+        if self.summary:
+            messages.append(
+                {"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}
+            )
+
+        recent_start = max(len(self._turns) - self.keep_recent_messages, 0)
+        for index, message in enumerate(self._turns):
+            if index < recent_start and self._is_tool_result(message):
+                message = {
+                    **message,
+                    "content": self.llm_client.token_counter.fit_text(
+                        message["content"], self.max_tool_result_tokens
+                    ),
+                }
+            messages.append(message)
+        return messages
+
+    @staticmethod
+    def _is_tool_result(message: Dict[str, str]) -> bool:
+        return message["role"] == "system" and message["content"].startswith(TOOL_RESULT_PREFIX)
+
+    def append(self, message: Dict[str, str]) -> None:
+        self._turns.append(message)
+
+    def token_count(self) -> int:
+        """Tokens of everything except the system prompt."""
+        return self.llm_client.token_counter.count_messages(self.messages[1:])
+
+    def maybe_compact(self) -> None:
+        """Start a background compaction if the history is over budget."""
+        if self._task is not None and not self._task.done():
+            return
+        if len(self._turns) <= self.keep_recent_messages:
+            return
+        if self.token_count() <= self.token_budget:
+            return
+        # Skip when the recent window alone is over budget and little would be folded
+        older = self.messages[-len(self._turns):-self.keep_recent_messages]
+        if self.llm_client.token_counter.count_messages(older) < self.token_budget // 4:
+            return
+        self._task = asyncio.create_task(self._compact())
+
+    def cancel_compaction(self) -> None:
+        """Stop a pending or running compaction so it does not compete with a user turn.
+
+        The history is only changed once a summary is complete, so a
+        cancelled compaction leaves it as it was; maybe_compact() starts a
+        new one after the turn.
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            self.deferred_compactions += 1
+            logging.info("History compaction deferred: a new turn started")
+        self._task = None
+
+    async def _compact(self) -> None:
+        await asyncio.sleep(self.idle_delay)
+        # Messages appended while the summary is generated stay untouched
+        count = len(self._turns) - self.keep_recent_messages
+        older = self._turns[:count]
+        before = self.token_count()
+
+        conversation = "\n".join(f"{message['role']}: {message['content']}" for message in older)
+        previous = f"Previous summary:\n{self.summary}\n\n" if self.summary else ""
+        prompt = SUMMARY_PROMPT.format(previous=previous, conversation=conversation)
+
+        try:
+            summary = await self.llm_client.get_response([{"role": "user", "content": prompt}])
+        except Exception as e:
+            logging.warning(f"History compaction failed: {e}")
+            return
+        if not summary or summary.startswith(("Error:", "I encountered", "FATAL ERROR")):
+            logging.warning(f"History compaction skipped: {summary}")
+            return
+
+        # Reasoning models may prepend a <think> block
+        self.summary = re.sub(r"<think>.*?</think>", "", summary, flags=re.DOTALL).strip()
+        self._turns = self._turns[count:]
+        self.compactions += 1
+        logging.info(
+            f"Compacted {count} messages into a summary: {before} -> {self.token_count()} tokens"
+        )
+
+    async def aclose(self) -> None:
+        """Cancel a running compaction."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
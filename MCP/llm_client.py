@@ -1,6 +1,27 @@
+import json
+import time
 import httpx
+import asyncio
 import logging
-from typing import Any, List, Dict
+from typing import Any, AsyncIterator, List, Dict, Optional
+
+from common.token_budget import get_token_counter, pack_messages
+
+DEFAULT_NUM_CTX = 8192
+# Tokens kept free for the model's reply when packing the prompt
+DEFAULT_RESERVE_TOKENS = 1024
+
+# Connection pool settings; generation can take minutes on local models,
+# so only the connect phase gets a short timeout
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_MAX_CONNECTIONS = 4
+DEFAULT_KEEPALIVE_EXPIRY = 300.0
+
+# How long Ollama keeps the model in memory after the last request
+DEFAULT_MODEL_KEEP_ALIVE = "30m"
+# A load time above this (seconds) means the model had been unloaded
+COLD_START_THRESHOLD = 1.0
 
 
 class LLMClient:
@@ -11,70 +32,189 @@ class LLMClient:
     If you get a 404 Not Found error, you MUST update your Ollama installation.
     """
 
-    def __init__(self, model: str = "qwen3:latest", ollama_base_url: str = "http://localhost:11434") -> None:
+    def __init__(
+        self,
+        model: str = "qwen3:latest",
+        ollama_base_url: str = "http://localhost:11434",
+        num_ctx: int = DEFAULT_NUM_CTX,
+        reserve_tokens: int = DEFAULT_RESERVE_TOKENS,
+        tokenizer_name: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        model_keep_alive: Any = DEFAULT_MODEL_KEEP_ALIVE,
+        ping_interval: Optional[float] = None,
+    ) -> None:
         """
         Initializes the LLM client to connect to an Ollama server.
 
         Args:
             model: The name of the Ollama model to use (e.g., 'llama3.2:3b').
             ollama_base_url: The base URL of the Ollama server.
+            num_ctx: Context window requested from Ollama; prompts are packed to fit it.
+            reserve_tokens: Tokens left free for the reply.
+            tokenizer_name: HuggingFace tokenizer for exact counts (approximate if None).
+            timeout: Read/write timeout in seconds for a single request.
+            connect_timeout: Timeout in seconds for opening a connection.
+            max_connections: Size of the connection pool (kept alive between calls).
+            keepalive_expiry: Seconds an idle pooled connection is kept open.
+            model_keep_alive: Ollama keep_alive sent with every request (e.g. "30m", -1 for forever).
+            ping_interval: If set, seconds between background pings that keep the model loaded.
         """
         self.model = model
         self.ollama_url = f"{ollama_base_url}/api/chat"  # Using the standard /api/chat endpoint
+        self.num_ctx = num_ctx
+        self.reserve_tokens = reserve_tokens
+        self.token_counter = get_token_counter(tokenizer_name)
+        self.last_prompt_report: Optional[Dict[str, Any]] = None
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self.model_keep_alive = model_keep_alive
+        self.ping_interval = ping_interval
+        self._ping_task: Optional[asyncio.Task] = None
+        # Model load time is tracked apart from generation time so cold starts stand out
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "cold_starts": 0,
+            "load_seconds": 0.0,
+            "generation_seconds": 0.0,
+        }
+        self.last_timings: Optional[Dict[str, float]] = None
         logging.info(f"LLMClient initialized for model '{self.model}' at '{self.ollama_url}'")
 
-    def get_response(self, messages: List[Dict[str, str]]) -> str:
-        """
-        Get a response from the local Ollama LLM using the /api/chat endpoint.
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                headers={"Content-Type": "application/json"},
+            )
+        return self._client
 
-        Args:
-            messages: A list of message dictionaries, representing the conversation history.
+    async def aclose(self) -> None:
+        """Stop background pings and close the connection pool."""
+        await self.stop_keepalive()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "LLMClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def _record_timings(self, data: Dict[str, Any], wall_seconds: float) -> None:
+        """Record Ollama's load and generation durations from a final response."""
+        if "load_duration" in data:
+            load_seconds = data["load_duration"] / 1e9
+        elif data.get("done_reason") == "load":
+            # A load-only request (empty messages) reports no durations; all of its time is the load
+            load_seconds = wall_seconds
+        else:
+            load_seconds = 0.0
+        generation_seconds = (data.get("prompt_eval_duration", 0) + data.get("eval_duration", 0)) / 1e9
+        self.last_timings = {
+            "load_seconds": load_seconds,
+            "generation_seconds": generation_seconds,
+            "wall_seconds": wall_seconds,
+        }
+        self.stats["requests"] += 1
+        self.stats["load_seconds"] += load_seconds
+        self.stats["generation_seconds"] += generation_seconds
+        if load_seconds > COLD_START_THRESHOLD:
+            self.stats["cold_starts"] += 1
+            logging.warning(f"Cold start: Ollama spent {load_seconds:.2f}s loading '{self.model}'")
+
+    async def ping(self) -> Optional[float]:
+        """
+        Load the model (if needed) without generating anything and refresh keep_alive.
 
         Returns:
-            The LLM's response as a string.
+            The model load time in seconds, or None if Ollama could not be reached.
+        """
+        payload = {"model": self.model, "messages": [], "keep_alive": self.model_keep_alive}
+        started = time.perf_counter()
+        try:
+            response = await self._get_client().post(self.ollama_url, json=payload)
+            response.raise_for_status()
+        except (httpx.HTTPStatusError, httpx.RequestError) as e:
+            logging.warning(f"Failed to ping Ollama model '{self.model}': {e}")
+            return None
+        self._record_timings(response.json(), time.perf_counter() - started)
+        return self.last_timings["load_seconds"]
 
-        Raises:
-            httpx.RequestError: If the request to the LLM fails.
+    async def preload(self) -> Optional[float]:
         """
-        headers = {
-            "Content-Type": "application/json",
-        }
+        Load the model at startup so the first user turn does not pay the load time.
+
+        Returns:
+            The model load time in seconds, or None if Ollama could not be reached.
+        """
+        load_seconds = await self.ping()
+        if load_seconds is not None:
+            logging.info(f"Model '{self.model}' preloaded in {load_seconds:.2f}s (keep_alive={self.model_keep_alive})")
+        return load_seconds
 
-        # Payload structure for Ollama's /api/chat endpoint (non-streaming)
-        payload = {
+    async def _ping_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await self.ping()
+
+    def start_keepalive(self) -> None:
+        """Start periodic pings if ping_interval is set."""
+        if self.ping_interval and (self._ping_task is None or self._ping_task.done()):
+            self._ping_task = asyncio.create_task(self._ping_loop())
+
+    async def stop_keepalive(self) -> None:
+        """Stop periodic pings."""
+        if self._ping_task is not None:
+            self._ping_task.cancel()
+            try:
+                await self._ping_task
+            except asyncio.CancelledError:
+                pass
+            self._ping_task = None
+
+    def _build_payload(self, messages: List[Dict[str, str]], stream: bool) -> Dict[str, Any]:
+        """Pack the conversation into num_ctx and build the /api/chat payload."""
+        # Fit system prompt, history and the latest message into num_ctx
+        # instead of letting Ollama truncate the prompt silently
+        packed = pack_messages(messages, self.num_ctx, self.reserve_tokens, self.token_counter)
+        self.last_prompt_report = packed.report
+        logging.info(
+            f"Prompt tokens: {packed.report['total_tokens']}/{packed.report['budget']} "
+            f"(system {packed.report['system_tokens']}, history {packed.report['history_tokens']}, "
+            f"payload {packed.report['payload_tokens']})"
+        )
+
+        # Payload structure for Ollama's /api/chat endpoint
+        return {
             "model": self.model,
-            "messages": messages,
-            "stream": False,  # Ensure a single response object
+            "messages": packed.messages,
+            "stream": stream,
+            "keep_alive": self.model_keep_alive,
             "options": {
                 "temperature": 0.7,
                 "top_p": 1,
+                "num_ctx": self.num_ctx,
             },
         }
 
-        try:
-            # Added a timeout for potentially long-running local models
-            with httpx.Client(timeout=120.0) as client:
-                logging.info(f"Sending request to Ollama with model: {self.model}")
-                response = client.post(self.ollama_url, headers=headers, json=payload)
-                
-                # Check for any client or server errors (4xx or 5xx)
-                response.raise_for_status()
-                
-                data = response.json()
-
-                # As per the documentation for non-streaming chat, the content is here:
-                # data -> message -> content
-                if "message" in data and "content" in data["message"]:
-                    return data["message"]["content"]
-                else:
-                    # Handle cases where the response format is unexpected
-                    logging.error(f"Unexpected response format from Ollama: {data}")
-                    return "Error: Received an unexpected response format from the model."
-
-        except httpx.HTTPStatusError as e:
+    @staticmethod
+    def _error_message(error: Exception) -> str:
+        """Turn a request failure into the message shown to the user."""
+        if isinstance(error, httpx.HTTPStatusError):
             # This block will now catch the 404 error if Ollama is still not updated
-            status_code = e.response.status_code
-            error_message = f"HTTP Status {status_code}: {e.response.text}"
+            status_code = error.response.status_code
+            error_message = f"HTTP Status {status_code}: {error.response.text}"
             logging.error(f"Error getting LLM response from Ollama: {error_message}", exc_info=True)
             if status_code == 404:
                 return (
@@ -84,9 +224,83 @@ class LLMClient:
                 )
             return f"I encountered an HTTP error: {status_code}. Please check the logs."
 
-        except httpx.RequestError as e:
-            logging.error("Error getting LLM response from Ollama", exc_info=True)
-            return (
-                f"I encountered a network error connecting to Ollama: {str(e)}. "
-                "Please ensure Ollama is running and accessible."
-            )
\ No newline at end of file
+        logging.error("Error getting LLM response from Ollama", exc_info=True)
+        return (
+            f"I encountered a network error connecting to Ollama: {str(error)}. "
+            "Please ensure Ollama is running and accessible."
+        )
+
+    async def get_response(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Get a response from the local Ollama LLM using the /api/chat endpoint.
+
+        The request runs on the shared connection pool. Cancelling the awaiting
+        task aborts the HTTP request, which makes Ollama stop generating.
+
+        Args:
+            messages: A list of message dictionaries, representing the conversation history.
+
+        Returns:
+            The LLM's response as a string.
+        """
+        payload = self._build_payload(messages, stream=False)
+
+        try:
+            logging.info(f"Sending request to Ollama with model: {self.model}")
+            started = time.perf_counter()
+            response = await self._get_client().post(self.ollama_url, json=payload)
+
+            # Check for any client or server errors (4xx or 5xx)
+            response.raise_for_status()
+
+            data = response.json()
+            self._record_timings(data, time.perf_counter() - started)
+
+            # As per the documentation for non-streaming chat, the content is here:
+            # data -> message -> content
+            if "message" in data and "content" in data["message"]:
+                return data["message"]["content"]
+            else:
+                # Handle cases where the response format is unexpected
+                logging.error(f"Unexpected response format from Ollama: {data}")
+                return "Error: Received an unexpected response format from the model."
+
+        except (httpx.HTTPStatusError, httpx.RequestError) as e:
+            return self._error_message(e)
+
+    async def stream_response(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Stream a response from the /api/chat endpoint chunk by chunk.
+
+        Closing the iterator early (e.g. once a tool call is recognised) closes
+        the HTTP response, which makes Ollama stop generating the rest.
+
+        Args:
+            messages: A list of message dictionaries, representing the conversation history.
+
+        Yields:
+            Pieces of the reply as they are generated. On failure, a single error message.
+        """
+        payload = self._build_payload(messages, stream=True)
+
+        try:
+            logging.info(f"Streaming request to Ollama with model: {self.model}")
+            started = time.perf_counter()
+            async with self._get_client().stream("POST", self.ollama_url, json=payload) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    content = data.get("message", {}).get("content", "")
+                    if content:
+                        yield content
+                    if data.get("done"):
+                        self._record_timings(data, time.perf_counter() - started)
+                        break
+
+        except (httpx.HTTPStatusError, httpx.RequestError) as e:
+            yield self._error_message(e)
@@ -1,5 +1,12 @@
+import sys
 import asyncio
 import logging
+from pathlib import Path
+
+# Shared modules live in the repository root (common/); set the path once at the entry point
+REPO_ROOT = str(Path(__file__).resolve().parents[1])
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
 
 from config import Configuration
 from server import Server
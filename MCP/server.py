@@ -1,14 +1,51 @@
 import os
+import time
+import errno
 import shutil
 import asyncio
 import logging
-from typing import Any
+from typing import Any, Awaitable, Callable
 from contextlib import AsyncExitStack
 
+import anyio
+
 from mcp.client.stdio import stdio_client
 from mcp import ClientSession, StdioServerParameters
+import mcp.types as types
 
 from tool import Tool
+from circuit_breaker import CircuitBreaker, CircuitOpenError, backoff_delay
+from tool_cache import ToolResultCache, tool_result_cache
+
+# Seconds a server may take to spawn and initialize (override with "startup_timeout" in servers_config.json)
+DEFAULT_STARTUP_TIMEOUT = 30.0
+# Seconds a single tool call may take before the server counts as unresponsive ("call_timeout")
+DEFAULT_CALL_TIMEOUT = 60.0
+# Upper bound of the backoff between tool call retries
+MAX_RETRY_DELAY = 10.0
+
+# Errors that mean the stdio transport is gone rather than that the tool failed
+CONNECTION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    ConnectionError,
+)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """Return True if error means the session's connection to the server is lost."""
+    if isinstance(error, CONNECTION_ERRORS):
+        return True
+    # McpError raised for requests pending when the server process exited
+    return getattr(getattr(error, "error", None), "code", None) == types.CONNECTION_CLOSED
+
+
+def is_permanent_startup_error(error: BaseException) -> bool:
+    """Return True if retrying the server command cannot help (missing or non-executable command)."""
+    if isinstance(error, (FileNotFoundError, PermissionError, ValueError)):
+        return True
+    return isinstance(error, OSError) and error.errno == errno.ENOEXEC
 
 
 class Server:
@@ -21,6 +58,44 @@ class Server:
         self.session: ClientSession | None = None
         self._cleanup_lock: asyncio.Lock = asyncio.Lock()
         self.exit_stack: AsyncExitStack = AsyncExitStack()
+        # Called when the server announces a tool list change
+        self.on_tools_changed: Callable[["Server"], Awaitable[None]] | None = None
+        self._background_tasks: set[asyncio.Task] = set()
+        self.startup_timeout: float = config.get("startup_timeout", DEFAULT_STARTUP_TIMEOUT)
+        self.startup_seconds: float | None = None
+        self.startup_error: str | None = None
+        # The stdio transport uses anyio cancel scopes, which must be entered and
+        # exited by the same task, so start() owns the connection in a dedicated task
+        self._lifecycle_task: asyncio.Task | None = None
+        self._ready: asyncio.Event = asyncio.Event()
+        self._stop: asyncio.Event = asyncio.Event()
+        # Opt-in result cache: {"cache": {"tools": {name: ttl_seconds}, "invalidate_on": [names]}}
+        cache_config = config.get("cache", {})
+        self.cache_ttls: dict[str, float] = cache_config.get("tools", {})
+        self.cache_invalidate_on: set[str] = set(cache_config.get("invalidate_on", []))
+        self.result_cache: ToolResultCache = tool_result_cache
+        # Health: {"call_timeout": s, "circuit_breaker": {"failure_threshold": n, "reset_timeout": s}}
+        self.call_timeout: float = config.get("call_timeout", DEFAULT_CALL_TIMEOUT)
+        self.breaker: CircuitBreaker = CircuitBreaker(**config.get("circuit_breaker", {}))
+        self.reconnect_count: int = 0
+        self._reconnect_lock: asyncio.Lock = asyncio.Lock()
+        # Bumped on every reconnect so concurrent callers reconnect a dead session only once
+        self._generation: int = 0
+
+    def _notify_tools_changed(self) -> None:
+        if self.on_tools_changed is None:
+            return
+        task = asyncio.create_task(self.on_tools_changed(self))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _handle_message(self, message: Any) -> None:
+        """Handle messages the server sends outside of a request."""
+        notification = getattr(message, "root", message)
+        if isinstance(notification, types.ToolListChangedNotification):
+            logging.info(f"Server {self.name} reported a tool list change")
+            # Refresh outside the session's receive loop so list_tools can be awaited
+            self._notify_tools_changed()
 
     async def initialize(self) -> None:
         """Initialize the server connection."""
@@ -45,15 +120,67 @@ class Server:
             )
             read, write = stdio_transport
             session = await self.exit_stack.enter_async_context(
-                ClientSession(read, write)
+                ClientSession(read, write, message_handler=self._handle_message)
             )
             await session.initialize()
             self.session = session
         except Exception as e:
             logging.error(f"Error initializing server {self.name}: {e}")
-            await self.cleanup()
+            await self._close()
             raise
 
+    async def _lifecycle(self) -> None:
+        """Own the connection: initialize, wait for stop(), then close in the same task."""
+        try:
+            await self.initialize()
+            self._ready.set()
+            await self._stop.wait()
+        finally:
+            await self._close()
+
+    async def start(self, timeout: float | None = None) -> float:
+        """Initialize the server in its own task, giving up after timeout seconds.
+
+        Args:
+            timeout: Startup timeout in seconds (defaults to startup_timeout).
+
+        Returns:
+            The startup time in seconds.
+
+        Raises:
+            TimeoutError: If the server did not become ready in time.
+            Exception: Whatever initialize() raised.
+        """
+        timeout = self.startup_timeout if timeout is None else timeout
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self.startup_error = None
+        started = time.perf_counter()
+
+        self._lifecycle_task = asyncio.create_task(self._lifecycle(), name=f"mcp-server-{self.name}")
+        ready = asyncio.create_task(self._ready.wait())
+        try:
+            await asyncio.wait(
+                {self._lifecycle_task, ready}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            ready.cancel()
+
+        elapsed = time.perf_counter() - started
+        if self._ready.is_set():
+            self.startup_seconds = elapsed
+            return elapsed
+
+        if self._lifecycle_task.done():
+            error = self._lifecycle_task.exception() or RuntimeError("server exited during startup")
+        else:
+            self._lifecycle_task.cancel()
+            await asyncio.gather(self._lifecycle_task, return_exceptions=True)
+            error = TimeoutError(f"server {self.name} did not start within {timeout:.1f}s")
+        self._lifecycle_task = None
+        self.startup_error = str(error) or type(error).__name__
+        raise error
+
     async def list_tools(self) -> list[Any]:
         """List available tools from the server."""
         if not self.session:
@@ -85,34 +212,148 @@ class Server:
         retries: int = 2,
         delay: float = 1.0,
     ) -> Any:
-        """Execute a tool with retry mechanism."""
-        if not self.session:
+        """Execute a tool with retry mechanism.
+
+        Results of tools declared cacheable are served from the result cache
+        until their TTL expires; failed results are never cached.
+
+        Retries wait with exponential backoff and jitter. If the server process
+        died, the session is rebuilt through a fresh stdio connection before
+        the next attempt. Connection failures and timeouts feed the circuit
+        breaker, and while it is open calls fail fast with CircuitOpenError.
+        """
+        ttl = self.cache_ttls.get(tool_name)
+        if ttl is not None:
+            cached = self.result_cache.get(self.name, tool_name, arguments)
+            if cached is not None:
+                logging.info(f"Cache hit for {tool_name}")
+                return cached
+
+        if not self.session and self.startup_seconds is None:
             raise RuntimeError(f"Server {self.name} not initialized")
 
+        # Results of calls overlapping an invalidating call are not cached
+        cache_generation = self.result_cache.generation(self.name)
+
+        if not self.breaker.allow():
+            raise CircuitOpenError(
+                f"Server {self.name} is unavailable (circuit open, retry in "
+                f"{self.breaker.retry_after():.0f}s): {self.breaker.last_error}"
+            )
+
         attempt = 0
         while attempt < retries:
+            generation = self._generation
+            connected = False
             try:
+                if not self.session:
+                    await self.reconnect(generation)
+                connected = True
                 logging.info(f"Executing {tool_name}...")
-                result = await self.session.call_tool(tool_name, arguments)
+                result = await asyncio.wait_for(
+                    self.session.call_tool(tool_name, arguments), timeout=self.call_timeout
+                )
+                self.breaker.record_success()
+                if ttl is not None and not getattr(result, "isError", False):
+                    self.result_cache.set(self.name, tool_name, arguments, result, ttl, cache_generation)
+                elif tool_name in self.cache_invalidate_on:
+                    removed = self.result_cache.invalidate(self.name)
+                    logging.info(f"{tool_name} invalidated {removed} cached results of {self.name}")
                 return result
             except Exception as e:
                 attempt += 1
+                if not connected or isinstance(e, asyncio.TimeoutError):
+                    self.breaker.record_failure(e)
+                elif is_connection_error(e):
+                    # Count a dead session once, not once per call that was using it;
+                    # the next attempt reconnects unless another call already did
+                    if await self._close_lost_session(generation):
+                        self.breaker.record_failure(e)
+                else:
+                    # The server answered; only the tool call failed
+                    self.breaker.record_success()
                 logging.warning(
-                    f"Error executing tool: {e}. Attempt {attempt} of {retries}."
+                    f"Error executing tool: {e!r}. Attempt {attempt} of {retries}."
                 )
+                if self.breaker.state == "open":
+                    logging.error(f"Circuit opened for server {self.name}. Failing.")
+                    raise
                 if attempt < retries:
-                    logging.info(f"Retrying in {delay} seconds...")
-                    await asyncio.sleep(delay)
+                    wait = backoff_delay(attempt - 1, delay, MAX_RETRY_DELAY)
+                    logging.info(f"Retrying in {wait:.2f} seconds...")
+                    await asyncio.sleep(wait)
                 else:
                     logging.error("Max retries reached. Failing.")
                     raise
 
-    async def cleanup(self) -> None:
-        """Clean up server resources."""
+    async def _close_lost_session(self, generation: int) -> bool:
+        """Tear down a dead session. Returns False if another call already did."""
+        async with self._reconnect_lock:
+            if generation != self._generation or self.session is None:
+                return False
+            logging.warning(f"Server {self.name} lost its connection")
+            await self._stop_lifecycle()
+            return True
+
+    async def reconnect(self, generation: int | None = None) -> None:
+        """Replace the session with a fresh stdio connection to a new server process.
+
+        Args:
+            generation: The session generation the caller saw; if another call
+                already reconnected since then, nothing is done.
+        """
+        async with self._reconnect_lock:
+            if generation is not None and generation != self._generation and self.session:
+                return
+            logging.info(f"Reconnecting to server {self.name}...")
+            await self._stop_lifecycle()
+            try:
+                seconds = await self.start()
+            except Exception as e:
+                logging.error(f"Reconnect to server {self.name} failed: {self.startup_error or e}")
+                raise
+            self._generation += 1
+            self.reconnect_count += 1
+            logging.info(f"Server {self.name} reconnected in {seconds:.2f}s")
+        # The new process may expose a different tool list
+        self._notify_tools_changed()
+
+    def health(self) -> dict[str, Any]:
+        """Connection and circuit breaker state of this server."""
+        if self.session is None:
+            status = "disconnected"
+        elif self.breaker.state == "closed" and not self.breaker.consecutive_failures:
+            status = "healthy"
+        else:
+            status = "degraded"
+        return {
+            "status": status,
+            "reconnects": self.reconnect_count,
+            "circuit": self.breaker.stats(),
+        }
+
+    async def _close(self) -> None:
         async with self._cleanup_lock:
             try:
                 await self.exit_stack.aclose()
+            except Exception as e:
+                logging.error(f"Error during cleanup of server {self.name}: {e}")
+            finally:
                 self.session = None
                 self.stdio_context = None
-            except Exception as e:
-                logging.error(f"Error during cleanup of server {self.name}: {e}")
\ No newline at end of file
+                self.exit_stack = AsyncExitStack()
+
+    async def _stop_lifecycle(self) -> None:
+        if self._lifecycle_task is not None:
+            # Let the owning task close the transport
+            self._stop.set()
+            await asyncio.gather(self._lifecycle_task, return_exceptions=True)
+            self._lifecycle_task = None
+        else:
+            await self._close()
+
+    async def cleanup(self) -> None:
+        """Clean up server resources."""
+        for task in list(self._background_tasks):
+            task.cancel()
+        await self._stop_lifecycle()
@@ -0,0 +1,105 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 512
+
+
+def make_cache_key(server_name: str, tool_name: str, arguments: dict[str, Any]) -> str:
+    """Build a cache key; arguments are canonicalized so key order does not matter."""
+    canonical = json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return f"{server_name}\x00{tool_name}\x00{canonical}"
+
+
+class ToolResultCache:
+    """LRU cache of tool results with a per-entry TTL.
+
+    Only tools declared cacheable in a server's servers_config.json entry are
+    stored, e.g. for a server exposing pure tools
+
+        "cache": {
+            "tools": {"calculator": 3600, "text_processor": 3600},
+            "invalidate_on": []
+        }
+
+    where the numbers are TTLs in seconds. Declare only tools whose result
+    depends on nothing but their arguments: reads of state that other
+    clients can change (files, databases) go stale. Calling a tool listed in
+    invalidate_on drops every cached result of that server, and results of
+    calls that were in flight at that moment are not stored (see generation()).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.per_tool: Dict[str, Dict[str, int]] = {}
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    def _count(self, server_name: str, tool_name: str, outcome: str) -> None:
+        counters = self.per_tool.setdefault(f"{server_name}/{tool_name}", {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def get(self, server_name: str, tool_name: str, arguments: dict[str, Any]) -> Optional[Any]:
+        key = make_cache_key(server_name, tool_name, arguments)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            self._count(server_name, tool_name, "misses")
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self._count(server_name, tool_name, "hits")
+        return entry[1]
+
+    def generation(self, server_name: str) -> int:
+        """Invalidation counter of a server; take it before calling a tool and pass it to set()."""
+        return self._generations.get(server_name, 0)
+
+    def set(
+        self,
+        server_name: str,
+        tool_name: str,
+        arguments: dict[str, Any],
+        result: Any,
+        ttl: float,
+        generation: Optional[int] = None,
+    ) -> bool:
+        """Store a result. Returns False if the server was invalidated since generation was taken."""
+        if generation is not None and generation != self.generation(server_name):
+            return False
+        key = make_cache_key(server_name, tool_name, arguments)
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, server_name: str) -> int:
+        """Drop every cached result of one server. Returns the number removed."""
+        self._generations[server_name] = self.generation(server_name) + 1
+        prefix = f"{server_name}\x00"
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else None,
+            "per_tool": self.per_tool,
+        }
+
+
+tool_result_cache = ToolResultCache()
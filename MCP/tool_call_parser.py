@@ -0,0 +1,139 @@
+import json
+from typing import Any, Dict, List, Optional
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+CODE_FENCE = "```"
+
+
+class ToolCallDetector:
+    """Incrementally detects whether a streamed reply is a tool call.
+
+    Feed the reply chunk by chunk. As soon as the leading JSON value closes
+    and looks like {"tool": ..., "arguments": ...} or an array of such
+    objects, feed() returns the calls so the caller can run them and stop the
+    rest of the generation. A leading <think> block and a ```json fence are
+    skipped.
+
+    state: "pending" -> "json" -> "complete", or "text" for a normal reply.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.state = "pending"
+        self.tool_calls: Optional[List[Dict[str, Any]]] = None
+        self.raw_tool_call: Optional[str] = None
+        self._pos = 0
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def undecided(self) -> bool:
+        """True while the reply might still turn out to be a tool call."""
+        return self.state in ("pending", "json")
+
+    def feed(self, chunk: str) -> Optional[List[Dict[str, Any]]]:
+        """Add a chunk of the reply.
+
+        Returns:
+            The parsed tool calls once the JSON value is complete, otherwise None.
+        """
+        if not self.undecided:
+            return None
+        self.buffer += chunk
+        if self.state == "pending":
+            self._skip_preamble()
+        if self.state == "json":
+            self._scan_json()
+        return self.tool_calls
+
+    def _skip_preamble(self) -> None:
+        while self._pos < len(self.buffer):
+            rest = self.buffer[self._pos:]
+            stripped = rest.lstrip()
+            if not stripped:
+                self._pos = len(self.buffer)
+                return
+            self._pos += len(rest) - len(stripped)
+
+            if stripped.startswith(THINK_OPEN):
+                end = stripped.find(THINK_CLOSE)
+                if end < 0:
+                    return  # wait for the end of the thinking block
+                self._pos += end + len(THINK_CLOSE)
+                continue
+
+            if stripped.startswith(CODE_FENCE):
+                # Skip the whole fence line, including a language tag such as "json"
+                end = stripped.find("\n")
+                if end < 0:
+                    return
+                self._pos += end + 1
+                continue
+
+            # A prefix of a marker may still be arriving
+            if any(marker.startswith(stripped) for marker in (THINK_OPEN, CODE_FENCE)):
+                return
+
+            if stripped[0] in "{[":
+                self.state = "json"
+                self._start = self._pos
+            else:
+                self.state = "text"
+            return
+
+    def _scan_json(self) -> None:
+        while self._pos < len(self.buffer):
+            char = self.buffer[self._pos]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish(self.buffer[self._start:self._pos])
+                    return
+
+    def _finish(self, raw: str) -> None:
+        try:
+            parsed = json.loads(raw)
+        except json.JSONDecodeError:
+            self.state = "text"
+            return
+        calls = parse_tool_calls(parsed)
+        if calls:
+            self.state = "complete"
+            self.tool_calls = calls
+            self.raw_tool_call = raw
+        else:
+            self.state = "text"
+
+
+def parse_tool_calls(value: Any) -> Optional[List[Dict[str, Any]]]:
+    """Normalize a decoded reply into a list of tool calls.
+
+    Returns:
+        The calls for a single call object or a non-empty array of them, otherwise None.
+    """
+    def is_call(item: Any) -> bool:
+        return isinstance(item, dict) and "tool" in item and "arguments" in item
+
+    if is_call(value):
+        return [value]
+    if isinstance(value, list) and value and all(is_call(item) for item in value):
+        return value
+    return None
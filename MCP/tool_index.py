@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from server import Server
+from tool import Tool
+
+
+class ToolIndex:
+    """Maps tool names to the server that provides them.
+
+    Built once at startup and refreshed per server when it announces a tool
+    list change or reconnects, so dispatching a tool call is a dictionary
+    lookup instead of a list_tools round-trip to every server. When several
+    servers expose the same tool name, the server listed first in the
+    configuration wins and the clash is logged.
+    """
+
+    def __init__(self, servers: List[Server]) -> None:
+        self.servers: List[Server] = servers
+        self.duplicates: Dict[str, List[str]] = {}
+        self._server_tools: Dict[str, List[Tool]] = {}
+        self._index: Dict[str, Server] = {}
+        self._tools: Dict[str, Tool] = {}
+
+    async def rebuild(self) -> None:
+        """List the tools of every initialized server concurrently and rebuild the index."""
+        await asyncio.gather(*(self._fetch(server) for server in self.servers))
+        self._build()
+        for name, tools in self._server_tools.items():
+            logging.info(f"Server '{name}' has {len(tools)} tools available")
+
+    async def refresh(self, server: Server) -> None:
+        """Re-list the tools of one server and rebuild the index."""
+        await self._fetch(server)
+        self._build()
+        logging.info(
+            f"Tool index refreshed for server '{server.name}' "
+            f"({len(self._server_tools.get(server.name, []))} tools)"
+        )
+
+    async def _fetch(self, server: Server) -> None:
+        if not server.session:
+            self._server_tools.pop(server.name, None)
+            return
+        try:
+            self._server_tools[server.name] = await server.list_tools()
+        except Exception as e:
+            logging.error(f"Failed to list tools for server '{server.name}': {e}")
+            self._server_tools.pop(server.name, None)
+
+    def _build(self) -> None:
+        index: Dict[str, Server] = {}
+        tools: Dict[str, Tool] = {}
+        providers: Dict[str, List[str]] = {}
+
+        for server in self.servers:
+            for tool in self._server_tools.get(server.name, []):
+                providers.setdefault(tool.name, []).append(server.name)
+                if tool.name not in index:
+                    index[tool.name] = server
+                    tools[tool.name] = tool
+
+        self.duplicates = {name: names for name, names in providers.items() if len(names) > 1}
+        for name, names in self.duplicates.items():
+            logging.warning(
+                f"Tool '{name}' is provided by several servers {names}; using '{names[0]}'"
+            )
+
+        self._index = index
+        self._tools = tools
+
+    def lookup(self, tool_name: str) -> Optional[Server]:
+        """Return the server that handles tool_name, or None."""
+        return self._index.get(tool_name)
+
+    @property
+    def tools(self) -> List[Tool]:
+        """All routable tools, in server configuration order."""
+        return list(self._tools.values())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "tools": len(self._index),
+            "servers": {name: len(tools) for name, tools in self._server_tools.items()},
+            "duplicates": self.duplicates,
+        }
@@ -0,0 +1,219 @@
+"""
+프롬프트 토큰 예산 관리 (FastAPI 요약 / MCP 채팅 / gradio 채팅에서 공유)
+
+- 토크나이저는 이름별로 한 번만 로드해 재사용하고, 없으면 근사치로 계산함
+- 같은 텍스트의 토큰 수는 캐시하여 대화 기록을 매 턴 다시 세지 않음
+- system prompt / 대화 기록 / 마지막 메시지(payload) 를 우선순위에 따라 num_ctx 안에 맞춤
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# chat 메시지 하나에 role 과 구분 토큰으로 추가되는 토큰 수 (근사치)
+MESSAGE_OVERHEAD_TOKENS = 4
+COUNT_CACHE_SIZE = 4096
+# 캐시에 저장하는 텍스트의 총 문자 수 상한 (키로 원문을 저장하므로 메모리 사용량을 제한함)
+COUNT_CACHE_MAX_CHARS = 2_000_000
+# 이보다 긴 텍스트(자막 전체 등)는 한 번만 세는 경우가 대부분이라 캐시하지 않음
+COUNT_CACHE_MAX_TEXT_CHARS = 65_536
+TRUNCATION_MARKER = "\n...(생략)..."
+
+def approx_token_count(text: str) -> int:
+    """
+    토크나이저 없이 토큰 수를 대략적으로 계산
+    (한글 등 비 ASCII 문자는 1자당 1토큰, ASCII 는 4자당 1토큰으로 계산)
+
+    문자 단위 반복 대신 encode 로 ASCII 문자 수를 세므로 긴 텍스트도 빠르게 계산함
+    """
+    ascii_count = len(text.encode("ascii", "ignore"))
+    return (len(text) - ascii_count) + ascii_count // 4 + 1
+
+_tokenizers: Dict[str, Any] = {}
+_tokenizer_lock = threading.Lock()
+
+def load_tokenizer(name: str):
+    """
+    HuggingFace 토크나이저를 이름별로 한 번만 로드함. 로드할 수 없으면 None (근사치 사용).
+    """
+    with _tokenizer_lock:
+        if name not in _tokenizers:
+            try:
+                from transformers import AutoTokenizer
+                _tokenizers[name] = AutoTokenizer.from_pretrained(name)
+            except Exception as e:
+                logger.warning(f"토크나이저를 로드할 수 없어 근사치로 계산합니다 ({name}) : {e}")
+                _tokenizers[name] = None
+        return _tokenizers[name]
+
+class TokenCounter:
+    """
+    토큰 수 계산기
+    tokenizer_name 이 없거나 로드에 실패하면 approx_token_count 를 사용함
+    """
+
+    def __init__(self,
+                 tokenizer_name: Optional[str] = None,
+                 cache_size: int = COUNT_CACHE_SIZE,
+                 cache_max_chars: int = COUNT_CACHE_MAX_CHARS):
+        self.tokenizer_name = tokenizer_name
+        self.tokenizer = load_tokenizer(tokenizer_name) if tokenizer_name else None
+        self.cache_size = cache_size
+        self.cache_max_chars = cache_max_chars
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._cache_chars = 0
+        self._lock = threading.Lock()
+
+    @property
+    def exact(self) -> bool:
+        return self.tokenizer is not None
+
+    def count(self, text: str, cache: bool = True) -> int:
+        """
+        text 의 토큰 수. cache=False 이거나 COUNT_CACHE_MAX_TEXT_CHARS 보다 긴 텍스트는 캐시하지 않음
+        """
+        if not text:
+            return 0
+        if self.tokenizer is None:
+            return approx_token_count(text)
+        cache = cache and len(text) <= COUNT_CACHE_MAX_TEXT_CHARS
+
+        if cache:
+            with self._lock:
+                cached = self._cache.get(text)
+                if cached is not None:
+                    self._cache.move_to_end(text)
+                    return cached
+
+        tokens = len(self.tokenizer(text, add_special_tokens=False)["input_ids"])
+        if cache:
+            with self._lock:
+                if text not in self._cache:
+                    self._cache_chars += len(text)
+                self._cache[text] = tokens
+                while len(self._cache) > self.cache_size or self._cache_chars > self.cache_max_chars:
+                    evicted, _ = self._cache.popitem(last=False)
+                    self._cache_chars -= len(evicted)
+        return tokens
+
+    @property
+    def cache_chars(self) -> int:
+        """캐시에 저장된 텍스트의 총 문자 수"""
+        return self._cache_chars
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        return sum(self.count(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+    def fit_text(self, text: str, max_tokens: int) -> str:
+        """
+        text 가 max_tokens 를 넘으면 앞부분만 남겨 잘라냄
+        """
+        if self.count(text) <= max_tokens:
+            return text
+        if max_tokens <= 0:
+            return ""
+
+        budget = max_tokens - self.count(TRUNCATION_MARKER)
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            # 이분 탐색 중의 잘린 텍스트는 다시 셀 일이 없으므로 캐시하지 않음
+            if self.count(text[:middle], cache=False) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low] + TRUNCATION_MARKER
+
+_counters: Dict[Optional[str], TokenCounter] = {}
+
+def get_token_counter(tokenizer_name: Optional[str] = None) -> TokenCounter:
+    """
+    tokenizer_name 별로 공유되는 TokenCounter
+    """
+    with _tokenizer_lock:
+        counter = _counters.get(tokenizer_name)
+    if counter is None:
+        counter = TokenCounter(tokenizer_name)
+        with _tokenizer_lock:
+            counter = _counters.setdefault(tokenizer_name, counter)
+    return counter
+
+class PackedPrompt:
+    """
+    pack_messages 결과
+    report : 영역별 토큰 수와 잘라낸 내용
+    """
+
+    def __init__(self, messages: List[Dict[str, str]], report: Dict[str, Any]):
+        self.messages = messages
+        self.report = report
+
+def pack_messages(messages: List[Dict[str, str]],
+                  num_ctx: int,
+                  reserve_tokens: int = 0,
+                  counter: Optional[TokenCounter] = None) -> PackedPrompt:
+    """
+    messages 를 num_ctx - reserve_tokens (응답용) 토큰 안에 맞춤
+
+    우선순위 (낮은 것부터 잘라냄)
+      1. 대화 기록 : 오래된 메시지부터 삭제
+      2. 마지막 메시지 (payload) : 뒷부분을 잘라냄
+      3. 맨 앞의 system 메시지 : 뒷부분을 잘라냄
+    """
+    counter = counter or get_token_counter()
+    budget = max(num_ctx - reserve_tokens, 0)
+
+    system = messages[:1] if messages and messages[0].get("role") == "system" else []
+    rest = messages[len(system):]
+    payload = rest[-1:]
+    history = rest[:-1]
+
+    def tokens(items: List[Dict[str, str]]) -> int:
+        return counter.count_messages(items)
+
+    original = {
+        "system_tokens" : tokens(system),
+        "history_tokens" : tokens(history),
+        "payload_tokens" : tokens(payload)
+    }
+
+    dropped = 0
+    history_tokens = original["history_tokens"]
+    fixed_tokens = original["system_tokens"] + original["payload_tokens"]
+    while history and fixed_tokens + history_tokens > budget:
+        history_tokens -= tokens(history[:1])
+        history = history[1:]
+        dropped += 1
+
+    truncated = []
+    for name, items in (("payload", payload), ("system", system)):
+        over = tokens(system) + tokens(history) + tokens(payload) - budget
+        if over <= 0 or not items:
+            continue
+        message = items[0]
+        content_budget = counter.count(message["content"]) - over
+        items[0] = {**message, "content" : counter.fit_text(message["content"], content_budget)}
+        truncated.append(name)
+
+    packed = system + history + payload
+    report = {
+        "num_ctx" : num_ctx,
+        "budget" : budget,
+        "exact" : counter.exact,
+        "original_tokens" : sum(original.values()),
+        "system_tokens" : tokens(system),
+        "history_tokens" : tokens(history),
+        "payload_tokens" : tokens(payload),
+        "dropped_messages" : dropped,
+        "truncated" : truncated
+    }
+    report["total_tokens"] = report["system_tokens"] + report["history_tokens"] + report["payload_tokens"]
+
+    if dropped or truncated:
+        logger.info(
+            f"프롬프트를 토큰 예산에 맞춤 : {report['original_tokens']} -> {report['total_tokens']} "
+            f"(예산 {budget}, 삭제 {dropped}개, 잘라냄 {truncated})"
+        )
+    return PackedPrompt(packed, report)
@@ -1,6 +1,19 @@
+import sys
+from pathlib import Path
+
 import gradio as gr
 import ollama
 
+# 저장소 루트의 공용 모듈 (common/) 을 import 할 수 있도록 앱 진입점에서 한 번만 경로를 추가함
+REPO_ROOT = str(Path(__file__).resolve().parents[1])
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from common.token_budget import pack_messages
+
+NUM_CTX = 8192
+# 응답을 위해 남겨둘 토큰 수
+RESERVE_TOKENS = 1024
+
 def ollama_chat_interface(message, history):
     messages_for_ollama = []
     for human, ai in history:
@@ -10,10 +23,13 @@ def ollama_chat_interface(message, history):
             messages_for_ollama.append({"role" : "assistant","content" : ai})
     
     messages_for_ollama.append({"role":"user","content":message})
+    # 오래된 대화부터 잘라서 num_ctx 안에 맞춤
+    packed = pack_messages(messages_for_ollama, NUM_CTX, RESERVE_TOKENS)
     response = ollama.chat(
         model='qwen3',
-        messages = messages_for_ollama,
-        stream=False
+        messages = packed.messages,
+        stream=False,
+        options={"num_ctx" : NUM_CTX}
     )
     return response['message']['content']
 